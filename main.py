@@ -1,6 +1,7 @@
 """[src]入口主程序"""
 
 import argparse
+import multiprocessing
 import sys
 from typing import List, Optional
 
@@ -30,4 +31,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # 打包后的程序启动解析进程时需要
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,214 @@
+"""[scripts]解析器基准测试"""
+
+import os
+import pathlib
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from src.OJSubmitter.Crawler import parsers
+from src.OJSubmitter.Crawler.parse_executor import ParseExecutor
+
+Parser = Callable[[str], Any]
+
+ROUNDS = 20
+SYNTHETIC_PAGES = 50
+
+SYNTHETIC_PAGE = """<html><head><title>Problem</title>
+<script>var t = "<h2>题目描述</h2>";</script></head><body>
+<div id="main"><center><h3>Problem {i}</h3></center>
+{padding}
+<h2>题目描述</h2><div class="content"><p>第{i}题: 给定两个整数 a 和 b, 输出 a+b.</p></div>
+<h2>输入</h2><div class="content">一行两个整数</div>
+<h2>输出</h2><div class="content">一个整数</div>
+<h2>样例输入</h2><div class="content"><span class="sampledata">1 2<br/>3 4</span></div>
+<h2>样例输出</h2><div class="content"><span class="sampledata">3<br/>7</span></div>
+<h2>带填充标签的C/C++原程序</h2><div class="content"><pre>int main(){{
+  int a,b; /*@@*/
+}}</pre></div>
+<h2>提示</h2><div class="content">无</div>
+</div></body></html>"""
+PADDING_ROW = '<tr><td class="x">{i}</td><td><a href="#">row</a></td></tr>'
+STAGE_PAGE = """<html><body><div id="main">
+<center><h3>关卡 1001</h3><span class="green">运行中</span> 开始时间: 2026-10-18 10:00:00</center>
+<table id="problemset"><thead><tr><th>状态</th><th>ID</th><th>标题</th></tr></thead>
+<tbody>{rows}</tbody></table></div>{padding}</body></html>"""
+STAGE_ROW = '<tr><td>{done}</td><td>{i}</td><td><a href="sproblem.php?pid={i}">题目{i}</a></td></tr>'
+STATUS_PAGE = """<html><body>{padding}<table id="result-tab">
+<tr class="toprow"><td>RunID</td><td>Result</td></tr>{rows}</table></body></html>"""
+STATUS_ROW = '<tr class="{cls}"><td>{rid}</td><td>正确</td></tr>'
+
+
+def _padding() -> str:
+    rows = "".join(PADDING_ROW.format(i=i) for i in range(200))
+    return f"<table>{rows}</table>"
+
+
+def synthetic_corpus() -> List[Tuple[str, str]]:
+    padding = _padding()
+    return [
+        (f"synthetic-{i}", SYNTHETIC_PAGE.format(i=i, padding=padding))
+        for i in range(SYNTHETIC_PAGES)
+    ]
+
+
+def stage_pages() -> List[str]:
+    padding = _padding()
+    return [
+        STAGE_PAGE.format(
+            rows="".join(STAGE_ROW.format(done="YN"[i % 2], i=i) for i in range(n)),
+            padding=padding,
+        )
+        for n in (10, 50, 200)
+    ]
+
+
+def status_pages() -> List[str]:
+    padding = _padding()
+    rows = "".join(
+        STATUS_ROW.format(cls=("evenrow", "oddrow")[i % 2], rid=9000 - i)
+        for i in range(20)
+    )
+    return [STATUS_PAGE.format(rows=rows, padding=padding)]
+
+
+def load_corpus(paths: List[str]) -> List[Tuple[str, str]]:
+    corpus: List[Tuple[str, str]] = []
+    for arg in paths:
+        path = pathlib.Path(arg)
+        files = sorted(path.rglob("*.htm*")) if path.is_dir() else [path]
+        corpus.extend((str(f), f.read_text(encoding="utf-8")) for f in files)
+    return corpus
+
+
+def measure(parser: Parser, pages: List[str]) -> Tuple[float, int]:
+    """返回(每页平均用时 sec, 单页解析的最大峰值内存 bytes)"""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for page in pages:
+            parser(page)
+    elapsed = (time.perf_counter() - start) / (ROUNDS * len(pages))
+
+    peak = 0
+    for page in pages:
+        tracemalloc.start()
+        parser(page)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def compare(title: str, fast: Parser, reference: Parser, pages: List[str]) -> bool:
+    """校验两者结果一致并输出用时与峰值内存, 返回是否一致"""
+    same = all(fast(page) == reference(page) for page in pages)
+    ref_time, ref_peak = measure(reference, pages)
+    fast_time, fast_peak = measure(fast, pages)
+    print(f"{title:-^50}")
+    print(
+        f"BeautifulSoup: {ref_time * 1000:.3f} ms/page, peak {ref_peak / 1024:.1f} KiB"
+    )
+    print(
+        f"Targeted:      {fast_time * 1000:.3f} ms/page, peak {fast_peak / 1024:.1f} KiB"
+    )
+    print(
+        f"Speedup: {ref_time / fast_time:.2f}x, "
+        f"peak memory: {fast_peak / ref_peak:.0%} of BeautifulSoup"
+        + ("" if same else ", MISMATCHED")
+    )
+    return same
+
+
+def compare_executor(title: str, parser: Parser, pages: List[str]) -> bool:
+    """同一批页面在本进程顺序解析, 与经ParseExecutor送到进程池并行解析的总用时"""
+    raw = [page.encode() for page in pages]
+    processes = max(2, os.cpu_count() or 1)
+    executor = ParseExecutor(processes=processes, min_size=0)
+    executor.map(parser, raw[:processes])  # 预热, 排除进程启动时间
+    default = ParseExecutor(processes=processes)
+
+    start = time.perf_counter()
+    expected = [parser(page) for page in pages]
+    inline_time = time.perf_counter() - start
+    start = time.perf_counter()
+    pooled = executor.map(parser, raw)
+    pooled_time = time.perf_counter() - start
+    executor.shutdown()
+
+    offloaded = sum(default.should_offload(page) for page in raw)
+    same = _without_fetched_at(pooled) == _without_fetched_at(expected)
+    print(f"{title:-^50}")
+    print(f"In-process:   {inline_time * 1000:.1f} ms for {len(pages)} pages")
+    print(f"{processes} processes: {pooled_time * 1000:.1f} ms for {len(pages)} pages")
+    print(
+        f"Speedup: {inline_time / pooled_time:.2f}x, "
+        f"{offloaded}/{len(pages)} pages above the default threshold "
+        f"({default.min_size // 1024} KiB)" + ("" if same else ", MISMATCHED")
+    )
+    return same
+
+
+def _without_fetched_at(results: List[Any]) -> List[Any]:
+    return [
+        {k: v for k, v in r.items() if k != "fetched_at"} if isinstance(r, dict) else r
+        for r in results
+    ]
+
+
+def _soup(page: str) -> BeautifulSoup:
+    return BeautifulSoup(page, "html.parser")
+
+
+def main() -> None:
+    corpus = load_corpus(sys.argv[1:]) or synthetic_corpus()
+    mismatched = [
+        name
+        for name, page in corpus
+        if parsers.parse_problem_content(page)
+        != parsers.parse_problem_content_soup(page)
+    ]
+    for name in mismatched:
+        print(f"Mismatch: {name}")
+    print(f"{len(corpus)} pages, {len(mismatched)} mismatched")
+
+    results = [
+        compare(
+            "parse_problem_content",
+            parsers.parse_problem_content,
+            parsers.parse_problem_content_soup,
+            [page for _, page in corpus],
+        ),
+        compare(
+            "parse_stage_rows",
+            parsers.parse_stage_rows,
+            lambda page: parsers._stage_rows(_soup(page)),
+            stage_pages(),
+        ),
+        compare(
+            "parse_running_status",
+            parsers.parse_running_status,
+            lambda page: parsers._running_status(_soup(page)),
+            stage_pages(),
+        ),
+        compare(
+            "parse_running_id",
+            parsers.parse_running_id,
+            lambda page: parsers._running_id(_soup(page)),
+            status_pages(),
+        ),
+        compare_executor(
+            "ParseExecutor: problem pages",
+            parsers.parse_problem_content,
+            [page for _, page in corpus],
+        ),
+        compare_executor(
+            "ParseExecutor: stage pages",
+            parsers.parse_stage_rows,
+            stage_pages() * 10,
+        ),
+    ]
+    print(f"-" * 50)
+    if mismatched or not all(results):
+        sys.exit(1)
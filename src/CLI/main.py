@@ -1,22 +1,26 @@
-import threading
-import time
 from typing import Dict, List, NoReturn, Optional
 
 from src.OJSubmitter.Models.identify import CookieModel
 
 from ..OJSubmitter.Constant.request_consts import LANGUAGE_MAP, Language
+from ..OJSubmitter.Constant.status import RunningStatus
 from ..OJSubmitter.Crawler.crawler import (
     LevelProblemPage,
     ProblemGroup,
     ProblemPackage,
-    RunningStatus,
 )
+from ..OJSubmitter.Crawler.stage_waiter import describe_wait_report
+from ..OJSubmitter.Crawler.stage_watcher import stage_watcher
+from ..OJSubmitter.Crawler.verdict_tracker import verdict_tracker
+from ..OJSubmitter.Remote.answer_cache import answer_cache
+from ..OJSubmitter.Remote.answer_pipeline import AnswerPipeline
 from ..OJSubmitter.Remote.remote_ctl import RemoteController
 from ..OJSubmitter.Resource import Resource
 from ..OJSubmitter.Store.shared_instances import SharedInstances
+from ..OJSubmitter.Transport.clock import server_clock
+from ..OJSubmitter.Transport.transport import transport
 from ..OJSubmitter.Typehint.problem import LevelProblemInfo, StageInfo
 from ..SecretAPI import SecretAPI
-from ..Typehint.basic import Digit
 from ..Util.functiontools import default_choice, do_nothing
 from .Constant.docstring import (
     ACCOUNT_MANAGE_HEADER,
@@ -44,12 +48,15 @@ def problem_submit() -> None:
         account=am.current_account,
     )
 
-    if not problem_group.is_existing:
+    # 只请求一次关卡页, 后续判断都读取这份快照
+    snapshot = problem_group.refresh()
+    if not snapshot["existing"]:
         logger.error("练习组不存在", source=LSE.CLI_PROBLEM_SUBMIT)
         return
 
+    status = snapshot["status"]
     submit_all_flag = False
-    if problem_group.running_status == RunningStatus.NOT_STARTED:
+    if status == RunningStatus.NOT_STARTED:
         logger.error("练习组未开始", source=LSE.CLI_PROBLEM_SUBMIT)
 
         if not default_choice(prompt="是否等待并提交全部未完成题目(Y/n)", default=True):
@@ -57,10 +64,26 @@ def problem_submit() -> None:
 
         submit_all_flag = True
         dynamic_loader = DynamicLoader("等待练习组开始中")
-        while problem_group.running_status == RunningStatus.NOT_STARTED:
-            dynamic_loader.next_for_times(times=3, interval=1)
+        report = problem_group.wait_until_started(on_poll=dynamic_loader.next)
+        dynamic_loader.clear()
+        logger.debug(describe_wait_report(report), source=LSE.CLI_PROBLEM_SUBMIT)
+        logger.debug(server_clock.describe(), source=LSE.CLI_PROBLEM_SUBMIT)
+        if report["error"]:
+            logger.error(
+                f"等待练习组开始失败: {report['error']}",
+                source=LSE.CLI_PROBLEM_SUBMIT,
+            )
+            return
+        if not report["existing"]:
+            logger.error("练习组不存在", source=LSE.CLI_PROBLEM_SUBMIT)
+            return
+        status = report["status"]
+
+    if status == RunningStatus.NO_ACCESS:
+        logger.error("练习组被屏蔽或者无权进入", source=LSE.CLI_PROBLEM_SUBMIT)
+        return
 
-    if problem_group.running_status == RunningStatus.ENDED:
+    if status == RunningStatus.ENDED:
         logger.error("练习组已结束", source=LSE.CLI_PROBLEM_SUBMIT)
 
         if not default_choice(prompt="是否强制提交(y/N)", default=False):
@@ -109,38 +132,36 @@ def problem_submit() -> None:
     language: Language = {**LANGUAGE_MAP, "": Language.py}[language_choice]
     remote: RemoteController = SharedInstances.remote
 
-    last_submit_time: Digit = 0
-
-    def submit_once(pts: LevelProblemPage, lang: Language) -> None:
-        nonlocal last_submit_time
-        ans = None
-
-        def get_ans() -> None:
-            nonlocal ans
-            ans = remote.get_ai_answer(problem=pts, language=lang)
-
-        thread = threading.Thread(target=get_ans)
-        thread.start()
-
-        dl = DynamicLoader("获取答案中")
-        while ans is None:
-            dl.next_for_times(times=3, interval=0.5)
-
+    logger.log(
+        f"获取{len(pages_to_submit)}道题目的答案中", source=LSE.CLI_PROBLEM_SUBMIT
+    )
+    pipeline = AnswerPipeline(
+        pages_to_submit,
+        lambda pts: remote.get_ai_answer(problem=pts, language=language),
+    )
+    for result in pipeline:
+        pts = pages_to_submit[result["index"]]
+        ans = result["answer"]
         if not ans:
-            logger.error("未获取到答案, 提交终止", source=LSE.CLI_PROBLEM_SUBMIT)
-            return
-
-        logger.debug(f"获取到答案: \n{ans}", source=LSE.CLI_PROBLEM_SUBMIT)
+            logger.error(
+                f"`{pts.page_info['topic']}`未获取到答案, 跳过 {result['error']}",
+                source=LSE.CLI_PROBLEM_SUBMIT,
+            )
+            continue
+
+        logger.debug(
+            f"获取到答案({result['elapsed']:.2f}秒): \n{ans}",
+            source=LSE.CLI_PROBLEM_SUBMIT,
+        )
         logger.log(
             f"提交答案到{pts.page_info['topic']}",
             source=LSE.CLI_PROBLEM_SUBMIT,
         )
-        pts.submit_code(ans, language_id=lang.value)
+        pts.submit_code(ans, language_id=language.value)
         logger.info("答案提交完成", source=LSE.CLI_PROBLEM_SUBMIT)
-        last_submit_time = time.time()
 
-    for p in pages_to_submit:
-        submit_once(p, language)
+    logger.debug(answer_cache.describe(), source=LSE.CLI_PROBLEM_SUBMIT)
+    logger.debug(transport.describe(), source=LSE.CLI_PROBLEM_SUBMIT)
 
 
 def account_manage() -> None:
@@ -258,6 +279,7 @@ def network_check() -> Optional[NoReturn]:
 
 
 def main() -> None:
+    stage_watcher.logger = verdict_tracker.logger = logger
     network_check()
 
     SharedInstances.remote.restore_config_to(SharedInstances.config.restore_config)
@@ -1,20 +1,33 @@
+import functools
 import time
 from enum import IntEnum
-from typing import List, Optional, Tuple, TypedDict
+from typing import Dict, List, Optional, Tuple, TypedDict
 
+import requests
 from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
 from PyQt6.QtWidgets import QCheckBox, QTableWidgetItem
 
 from ...OJSubmitter.Constant.request_consts import Language
+from ...OJSubmitter.Constant.status import RunningStatus, Verdict
 from ...OJSubmitter.Crawler.crawler import (
+    Account,
     LevelProblemPage,
     ProblemGroup,
-    ProblemPackage,
-    RunningStatus,
+    prefetch_pages,
 )
+from ...OJSubmitter.Crawler.stage_waiter import describe_wait_report
 from ...OJSubmitter.Interface.log_interface import BaseLogger, LogLevels
+from ...OJSubmitter.Remote.answer_cache import answer_cache
+from ...OJSubmitter.Remote.answer_pipeline import AnswerPipeline
 from ...OJSubmitter.Store.shared_instances import AccountManager, SharedInstances
-from ...OJSubmitter.Typehint.problem import LevelProblemInfo
+from ...OJSubmitter.Transport.clock import server_clock
+from ...OJSubmitter.Transport.transport import transport
+from ...OJSubmitter.Typehint.problem import (
+    LevelProblemInfo,
+    StageDiff,
+    StageRow,
+    VerdictRow,
+)
 from ...OJSubmitter.Typehint.remote_cfg import ConfigParams
 from ...Typehint.basic import Digit, NonCallback
 from ...Util.function_linker import FunctionLinker
@@ -30,6 +43,53 @@ class QThreadSignalInfo(IntEnum):
     works_finished = 2
 
 
+class StageDiffRelay(QObject):
+    """将任意线程中产生的关卡变化转为Qt信号, 由接收方所在线程处理"""
+
+    diff_received = pyqtSignal(object)  # StageDiff
+
+    def emit(self, diff: StageDiff) -> None:
+        self.diff_received.emit(diff)
+
+
+class StageRowsThread(QThread):
+    """在后台逐行读取关卡题目, 每读到一行即发出信号"""
+
+    row_ready = pyqtSignal(object)  # StageRow
+    failed = pyqtSignal(str)
+    succeeded = pyqtSignal()
+
+    def __init__(self, group: ProblemGroup) -> None:
+        super().__init__()
+        self.group = group
+        self._cancelled = False
+
+    def run(self) -> None:
+        rows = self.group.iter_problem_rows()
+        try:
+            for ppack in rows:
+                if self._cancelled:
+                    return
+                info = ppack["page"].page_info
+                self.row_ready.emit(
+                    StageRow(
+                        pid=info["pid"],
+                        topic=info["topic"],
+                        finished=ppack["finished"],
+                    )
+                )
+        except requests.RequestException as e:
+            self.failed.emit(str(e))
+            return
+        finally:
+            rows.close()
+        if not self._cancelled:
+            self.succeeded.emit()
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+
 class RespondentThread(QThread):
     signal_info = pyqtSignal(int)  # QThreadSignalInfo
     process_msg = pyqtSignal(str, str)  # str, LogLevels
@@ -89,6 +149,7 @@ class RespondentThread(QThread):
         self.callback = callback
         self.submit_directly = submit_directly
         self._terminate = False
+        self._pipeline: Optional[AnswerPipeline] = None
         self._interval: Digit = 10  # default 10 secs
 
     def set_interval(self, seconds: float) -> None:
@@ -101,19 +162,27 @@ class RespondentThread(QThread):
         if self.group is None:
             return None
 
-        while True:
-            if self._terminate:
-                return None
-
-            if not self.group.is_running or any(
-                p.is_problem_running for p in self.problems
-            ):
-                if next_fn:
-                    next_fn()
-
-                time.sleep(1.5)
-                continue
-            break
+        report = self.group.wait_until_started(
+            interval=1.5,
+            should_stop=lambda: self._terminate,
+            on_poll=next_fn,
+        )
+        self.process_msg.emit(describe_wait_report(report), LogLevels.DEBUG)
+        self.process_msg.emit(server_clock.describe(), LogLevels.DEBUG)
+        if report["error"]:
+            self.process_msg.emit(
+                f"等待关卡开始失败: {report['error']}, 停止提交", LogLevels.ERROR
+            )
+            self._terminate = True
+        elif not report["existing"]:
+            self.process_msg.emit("关卡不存在, 停止提交", LogLevels.ERROR)
+            self._terminate = True
+        elif report["status"] == RunningStatus.NO_ACCESS:
+            self.process_msg.emit("关卡被屏蔽或者无权进入, 停止提交", LogLevels.ERROR)
+            self._terminate = True
+        elif report["status"] == RunningStatus.ENDED:
+            self.process_msg.emit("关卡已结束, 停止提交", LogLevels.WARN)
+            self._terminate = True
 
     def run(self) -> None:
         if not self.submit_directly:
@@ -126,26 +195,46 @@ class RespondentThread(QThread):
         if self.group is not None:
             problems = self.group.problems
 
+        # 题目页并发预取, 之后的答题与提交不再等待逐页加载
+        start = time.monotonic()
+        for timing in prefetch_pages(problems):
+            if timing["ok"]:
+                self.process_msg.emit(
+                    f"加载`{timing['topic']}`用时{timing['elapsed']:.2f}秒",
+                    LogLevels.DEBUG,
+                )
+            else:
+                self.process_msg.emit(
+                    f"加载`{timing['topic']}`失败: {timing['error']}", LogLevels.WARN
+                )
+        self.process_msg.emit(
+            f"预取{len(problems)}道题目用时{time.monotonic() - start:.2f}秒",
+            LogLevels.DEBUG,
+        )
+
         last_sub_time: Digit = 0
 
-        for p in problems:
+        # 提交方等待提交间隔时, 后续题目的答案已在生成
+        self._pipeline = AnswerPipeline(
+            problems, self._generate_answer, permit=self._use_permission
+        )
+        for result in self._pipeline:
+            if self._terminate:
+                break
+            p = problems[result["index"]]
             tpc = p.page_info["topic"]
-            self.process_msg.emit(f"正在提交`{tpc}`", LogLevels.WARN)
-
-            rmt = SharedInstances.remote
-            up = rmt.use_permission(p.account.account)
+            ans = result["answer"]
+            if result["error"]:
+                self.process_msg.emit(
+                    f"`{tpc}` 获取答案失败: {result['error']}", LogLevels.ERROR
+                )
+                continue
 
             self.process_msg.emit(
-                f"`{p.account.account}`剩余余额:{up['quota']}token(s)", LogLevels.INFO
+                f"`{tpc}` 获取答案完成({result['elapsed']:.2f}秒): \n{ans}",
+                LogLevels.INFO,
             )
 
-            ans = rmt.get_ai_answer(
-                problem=p,
-                language=self.language,
-            )
-
-            self.process_msg.emit(f"`{tpc}` 获取答案完成: \n{ans}", LogLevels.INFO)
-
             need_wait = last_sub_time + self._interval - time.time()
             if need_wait > 0:
                 self.process_msg.emit(f"等待 {need_wait:.2f} 秒", LogLevels.DEBUG)
@@ -154,16 +243,64 @@ class RespondentThread(QThread):
             if not ans:
                 continue
 
-            p.submit_code(ans, self.language)
+            self.process_msg.emit(f"正在提交`{tpc}`", LogLevels.WARN)
+            p.submit_code(
+                ans,
+                self.language,
+                on_verdict=functools.partial(self._report_verdict, p),
+            )
             last_sub_time = time.time()
             self.process_msg.emit(f"提交`{tpc}`完成", LogLevels.INFO)
 
+        self.process_msg.emit(answer_cache.describe(), LogLevels.DEBUG)
+        self.process_msg.emit(transport.describe(), LogLevels.DEBUG)
+
         self.signal_info.emit(
             QThreadSignalInfo.run_finished | QThreadSignalInfo.works_finished
         )
 
+    def _use_permission(self, p: LevelProblemPage) -> Optional[int]:
+        """在答案生成线程中调用, 答案已缓存时不占用额度"""
+        rmt = SharedInstances.remote
+        if rmt.has_cached_answer(p, self.language):
+            return None
+        up = rmt.use_permission(p.account.account)
+        self.process_msg.emit(
+            f"`{p.account.account}`剩余余额:{up['quota']}token(s)", LogLevels.INFO
+        )
+        return int(up["quota"])
+
+    def _generate_answer(self, p: LevelProblemPage) -> str:
+        """在答案生成线程中调用"""
+        rmt = SharedInstances.remote
+        tpc = p.page_info["topic"]
+        similar = rmt.similar_answer(p, self.language)
+        if similar is not None:
+            self.process_msg.emit(
+                f"`{tpc}`与已回答的题目相似(相似度{similar['similarity']:.0%})",
+                LogLevels.DEBUG,
+            )
+        self.process_msg.emit(f"正在获取`{tpc}`的答案", LogLevels.DEBUG)
+        return rmt.get_ai_answer(
+            problem=p,
+            language=self.language,
+        )
+
+    def _report_verdict(self, p: LevelProblemPage, row: VerdictRow) -> None:
+        """在评测结果跟踪线程中调用, 未通过时删除该题的缓存答案"""
+        tpc = p.page_info["topic"]
+        accepted = row["verdict"] == Verdict.ACCEPTED
+        self.process_msg.emit(
+            f"`{tpc}`(运行号{row['running_id']})评测结果: {row['result']}",
+            LogLevels.INFO if accepted else LogLevels.WARN,
+        )
+        if not accepted and SharedInstances.remote.invalidate_answer(p, self.language):
+            self.process_msg.emit(f"`{tpc}`的缓存答案未通过, 已删除", LogLevels.DEBUG)
+
     def terminate(self) -> None:
         self._terminate = True
+        if self._pipeline is not None:
+            self._pipeline.stop()
 
     @property
     def is_alive(self) -> bool:
@@ -171,6 +308,13 @@ class RespondentThread(QThread):
 
 
 class LevelModeTableLogic(LogicFrame):
+    STATUS_LABELS: Dict[RunningStatus, str] = {
+        RunningStatus.NOT_STARTED: "未开启",
+        RunningStatus.RUNNING: "运行中",
+        RunningStatus.ENDED: "已结束",
+        RunningStatus.NO_ACCESS: "无权限",
+    }
+
     def __init__(self, window: BasicWindow):
         super().__init__(window)
 
@@ -212,7 +356,12 @@ class LevelModeTableLogic(LogicFrame):
         self.debounce.setSingleShot(True)
 
         self.problem_group: Optional[ProblemGroup] = None
+        self._unsubscribe_stage: Optional[NonCallback] = None
+        # 关卡可能在提交线程中刷新, 表格更新需回到GUI线程
+        self.stage_relay = StageDiffRelay()
+        self.stage_relay.diff_received.connect(self.apply_stage_diff)
         self.respondent_threads: List[RespondentThread] = []
+        self.rows_threads: List[StageRowsThread] = []
 
     def update_frames(self) -> None:
         self.update_choose_all_btn_text()
@@ -329,12 +478,27 @@ class LevelModeTableLogic(LogicFrame):
 
     def detect_problems(self) -> None:
         """[按钮.行为]检测题目, 更新列表与状态"""
-        self.problem_group = None
+        try:
+            self._detect_problems()
+        except requests.RequestException as e:
+            self._on_detect_failed(str(e))
+
+    def _on_detect_failed(self, error: str) -> None:
+        self.logger.emit(
+            f"检测题目失败: {error}",
+            source=LogSourceEnum.PROBLEM_DETECT_SYSTEM,
+            lvl="ERR",
+        )
+        self.window.problem_status_label.setText("请求失败")
+
+    def _detect_problems(self) -> None:
         cid_txt = self.window.cid_text.text().strip()
         if cid_txt == "":
+            self._set_problem_group(None)
             self.clear_table()
             return None
         if cid_txt.isnumeric() is False:
+            self._set_problem_group(None)
             self.logger.emit(
                 f"请输入有效的关卡ID",
                 source=LogSourceEnum.PROBLEM_DETECT_SYSTEM,
@@ -343,73 +507,202 @@ class LevelModeTableLogic(LogicFrame):
             return None
 
         cid = int(cid_txt)
-        if self.account_manager.current_account is None:
+        account = self.account_manager.current_account
+        if account is None:
+            self._set_problem_group(None)
             self.logger.error(
                 "当前没有登录的账号",
                 source=LogSourceEnum.PROBLEM_DETECT_SYSTEM,
             )
             return None
 
-        self.problem_group = ProblemGroup(
-            {"cid": cid}, self.account_manager.current_account
+        self._load_rows(self._group_for(cid, account))
+
+    def _load_rows(self, group: ProblemGroup) -> None:
+        """后台逐行读取题目, 每读到一行即插入表格
+
+        读完后快照的差异(经订阅)再更新状态, 并修正表格.
+        """
+        for running in self.rows_threads:
+            running.cancel()
+        thread = StageRowsThread(group)
+        thread.row_ready.connect(lambda row: self._on_stage_row(group, row))
+        thread.failed.connect(self._on_detect_failed)
+        thread.succeeded.connect(lambda: self._on_detect_succeeded(group))
+        thread.finished.connect(lambda: self.rows_threads.remove(thread))
+        self.rows_threads.append(thread)
+        thread.start()
+
+    def _on_detect_succeeded(self, group: ProblemGroup) -> None:
+        """每次检测成功都按快照重置状态标签(可能停留在"请求失败")"""
+        snapshot = group.last_snapshot
+        if group is not self.problem_group or snapshot is None:
+            return None
+        if not snapshot["existing"]:
+            self.window.problem_status_label.setText("不存在")
+        else:
+            self.window.problem_status_label.setText(
+                self.STATUS_LABELS[snapshot["status"]]
+            )
+        self.logger.emit(
+            f"{snapshot['cid']} 检测完成, 共{len(snapshot['rows'])}题",
+            source=LogSourceEnum.PROBLEM_DETECT_SYSTEM,
+            lvl="INF",
         )
 
-        if not self.problem_group.is_existing:
+    def _on_stage_row(self, group: ProblemGroup, row: StageRow) -> None:
+        if group is not self.problem_group:
+            return None
+        self._insert_rows([row])
+        self.update_frames()
+
+    def _group_for(self, cid: int, account: Account) -> ProblemGroup:
+        """当前关卡与账号对应的ProblemGroup, 变化时重建并清空表格"""
+        group = self.problem_group
+        if group is None or group.stage["cid"] != cid or group.account is not account:
+            group = ProblemGroup({"cid": cid}, account)
+            self._set_problem_group(group)
             self.clear_table()
-            self.logger.emit(
-                f"{cid} 关卡不存在",
-                source=LogSourceEnum.PROBLEM_DETECT_SYSTEM,
-                lvl="ERR",
-            )
-            self.window.problem_status_label.setText("不存在")
+        return group
+
+    def _set_problem_group(self, group: Optional[ProblemGroup]) -> None:
+        if self._unsubscribe_stage is not None:
+            self._unsubscribe_stage()
+            self._unsubscribe_stage = None
+        self.problem_group = group
+        if group is not None:
+            self._unsubscribe_stage = group.subscribe(self.stage_relay.emit)
+
+    @staticmethod
+    def _is_table_visible(status: Optional[RunningStatus]) -> bool:
+        return status in (RunningStatus.RUNNING, RunningStatus.ENDED)
+
+    def apply_stage_diff(self, diff: StageDiff) -> None:
+        """按关卡变化更新状态与表格, 仅改动变化的行"""
+        cid = diff["cid"]
+        if not diff["existing"]:
+            if diff["existing_changed"]:
+                self.clear_table()
+                self.logger.emit(
+                    f"{cid} 关卡不存在",
+                    source=LogSourceEnum.PROBLEM_DETECT_SYSTEM,
+                    lvl="ERR",
+                )
+                self.window.problem_status_label.setText("不存在")
             return None
 
-        status: RunningStatus = self.problem_group.running_status
+        status = diff["status"]
+        if status != diff["previous_status"] or diff["existing_changed"]:
+            self._report_status(cid, status)
+
+        if not self._is_table_visible(status):
+            self.clear_table()
+        elif not self._is_table_visible(diff["previous_status"]):
+            # 在GUI线程中, 只用已保存的快照, 不发起请求
+            snapshot = (
+                None if self.problem_group is None else self.problem_group.last_snapshot
+            )
+            self._sync_rows(diff["added"] if snapshot is None else snapshot["rows"])
+        else:
+            for row in diff["removed"]:
+                index = self._find_table_row(row["pid"])
+                if index is not None:
+                    self.window.problem_table.removeRow(index)
+            self._insert_rows(diff["added"])
+            for row in diff["finished_changed"]:
+                index = self._find_table_row(row["pid"])
+                if index is not None:
+                    self.window.problem_table.setItem(
+                        index,
+                        1,
+                        QTableWidgetItem(
+                            "Finished" if row["finished"] else "Unfinished"
+                        ),
+                    )
+
+        self.update_frames()
 
+    def _report_status(self, cid: int, status: RunningStatus) -> None:
         if status == RunningStatus.NOT_STARTED:
             self.logger.emit(
                 f"{cid} 关卡未开启",
                 source=LogSourceEnum.PROBLEM_DETECT_SYSTEM,
                 lvl="WRN",
             )
-            self.clear_table()
-            self.window.problem_status_label.setText("未开启")
-            return None
+            self.window.problem_status_label.setText(
+                self.STATUS_LABELS[RunningStatus.NOT_STARTED]
+            )
         elif status == RunningStatus.ENDED:
             self.logger.emit(
                 f"{cid} 关卡已结束",
                 source=LogSourceEnum.PROBLEM_DETECT_SYSTEM,
                 lvl="WRN",
             )
-            self.window.problem_status_label.setText("已结束")
+            self.window.problem_status_label.setText(
+                self.STATUS_LABELS[RunningStatus.ENDED]
+            )
         elif status == RunningStatus.NO_ACCESS:
             self.logger.emit(
                 f"{cid} 关卡无权限访问",
                 source=LogSourceEnum.PROBLEM_DETECT_SYSTEM,
                 lvl="ERR",
             )
-            self.clear_table()
-            self.window.problem_status_label.setText("无权限")
-            return None
+            self.window.problem_status_label.setText(
+                self.STATUS_LABELS[RunningStatus.NO_ACCESS]
+            )
         else:
-            self.window.problem_status_label.setText("运行中")
+            self.window.problem_status_label.setText(
+                self.STATUS_LABELS[RunningStatus.RUNNING]
+            )
 
-        problems: List[ProblemPackage] = self.problem_group.problem_with_states
-        self.window.problem_table.setRowCount(len(problems))
-        for i, problem in enumerate(problems):
-            page: LevelProblemPage = problem["page"]
-            page_info = page.page_info
+    def _find_table_row(self, pid: int) -> Optional[int]:
+        for index in range(self.window.problem_table.rowCount()):
+            item = self.window.problem_table.item(index, 2)
+            if item is not None and item.text() == str(pid):
+                return index
+        return None
+
+    def _sync_rows(self, rows: List[StageRow]) -> None:
+        """使表格与`rows`一致, 保留已有行的勾选状态"""
+        pids = {str(row["pid"]) for row in rows}
+        table = self.window.problem_table
+        for index in reversed(range(table.rowCount())):
+            item = table.item(index, 2)
+            if item is None or item.text() not in pids:
+                table.removeRow(index)
+        self._insert_rows(rows)
+
+    def _insert_rows(self, rows: List[StageRow]) -> None:
+        """按题号顺序插入行, 已有的行只更新完成状态与标题"""
+        table = self.window.problem_table
+        for row in sorted(rows, key=lambda r: r["pid"]):
+            existing = self._find_table_row(row["pid"])
+            if existing is not None:
+                table.setItem(
+                    existing,
+                    1,
+                    QTableWidgetItem("Finished" if row["finished"] else "Unfinished"),
+                )
+                table.setItem(existing, 3, QTableWidgetItem(row["topic"]))
+                continue
+
+            index = 0
+            while index < table.rowCount():
+                item = table.item(index, 2)
+                if item is not None and int(item.text()) > row["pid"]:
+                    break
+                index += 1
+
+            table.insertRow(index)
             button, finished_item, id_item, topic_item = self.create_table_line(
-                problem["finished"],
-                str(page_info["pid"]),
-                page_info["topic"],
+                row["finished"],
+                str(row["pid"]),
+                row["topic"],
             )
-            self.window.problem_table.setCellWidget(i, 0, button)
-            self.window.problem_table.setItem(i, 1, finished_item)
-            self.window.problem_table.setItem(i, 2, id_item)
-            self.window.problem_table.setItem(i, 3, topic_item)
-
-        self.update_frames()
+            table.setCellWidget(index, 0, button)
+            table.setItem(index, 1, finished_item)
+            table.setItem(index, 2, id_item)
+            table.setItem(index, 3, topic_item)
 
     def get_selected_problems(self) -> Optional[List[LevelProblemPage]]:
         """[按钮.行为]提交选中题目"""
@@ -448,8 +741,14 @@ class LevelModeTableLogic(LogicFrame):
             )
             return None
 
+        # 复用关卡中已有的页面对象, 保留已加载的题目内容
+        known = {
+            (p.page_info["pid"], p.page_info["topic"]): p
+            for p in self.problem_group.problems
+        }
         return [
-            LevelProblemPage(
+            known.get((pack["pid"], pack["topic"]))
+            or LevelProblemPage(
                 page_info=LevelProblemInfo(
                     level_mode=True,
                     cid=self.problem_group.stage["cid"],
@@ -522,13 +821,11 @@ class LevelModeTableLogic(LogicFrame):
             )
             return None
 
-        self.problem_group = ProblemGroup(
-            {"cid": int(cid)}, self.account_manager.current_account
-        )
-
         wk = RespondentThread.load_from_group(
             parent=self.window,
-            problem_group=self.problem_group,
+            problem_group=self._group_for(
+                int(cid), self.account_manager.current_account
+            ),
             callback=lambda: self.logger.emit(
                 "自动提交等待中...",
                 source=LogSourceEnum.PROBLEM_SUBMIT_SYSTEM,
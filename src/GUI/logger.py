@@ -1,11 +1,13 @@
 from typing import List
 
+from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtWidgets import QMessageBox, QWidget
 
 from ..OJSubmitter.Interface.log_interface import (
     BaseLogger,
     CallbackFunction,
     LogLevels,
+    UnionLogLevel,
 )
 
 
@@ -57,3 +59,22 @@ class GUILogger(BaseLogger):
 
     def set_callback(self, callback: CallbackFunction) -> None:
         BaseLogger.set_callback(self, callback)
+
+
+class _LogRelay(QObject):
+    message = pyqtSignal(str, str, str)  # msg, source, LogLevels
+
+
+class QueuedLogger(BaseLogger):
+    """供后台线程使用的日志器: 经Qt信号转到GUI线程写入`target`, 不弹窗"""
+
+    callbacks: List[CallbackFunction] = []
+
+    def __init__(self, target: BaseLogger) -> None:
+        self._relay = _LogRelay()
+        self._relay.message.connect(
+            lambda msg, source, lvl: target.emit(msg, source, LogLevels(lvl))
+        )
+
+    def emit(self, msg: str, source: str, lvl: UnionLogLevel, color: str = "") -> None:
+        self._relay.message.emit(msg, source, str(lvl))
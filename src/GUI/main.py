@@ -5,13 +5,15 @@ from typing import NoReturn
 from PyQt6.QtWidgets import QApplication
 from qdarkstyle import load_stylesheet_pyqt6  # type: ignore[import-untyped]
 
+from ..OJSubmitter.Crawler.stage_watcher import stage_watcher
+from ..OJSubmitter.Crawler.verdict_tracker import verdict_tracker
 from ..OJSubmitter.Store.shared_instances import SharedInstances
 from .components.account_logic import AccountLogic
 from .components.log_browser_logic import LogBrowserLogic
 from .components.problem_logic import LevelModeTableLogic
 from .components.settings_logic import SettingsLogic
 from .handlers import GUIErrorHandler
-from .logger import GUILogger
+from .logger import GUILogger, QueuedLogger
 from .UI import BasicWindow, LogicFrame
 from .Util.qt_tools import MsgBtn, qt_dialog
 
@@ -45,6 +47,9 @@ def main() -> NoReturn:
     window = MainWindow()
     error_handler = GUIErrorHandler(window, openTraceback=True)
     SharedInstances.loggers.restore_logger(GUILogger(window))
+    stage_watcher.logger = verdict_tracker.logger = QueuedLogger(
+        SharedInstances.loggers.o_logger
+    )
     result = error_handler.fetch(
         SharedInstances.remote.check_remote_connection, display_dialog=False
     ).run()
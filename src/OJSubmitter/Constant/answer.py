@@ -0,0 +1,34 @@
+from typing import Final
+
+# local_config keys
+CFG_ANSWER_LOOKAHEAD: Final[str] = "answer_lookahead"
+CFG_ANSWER_WORKERS: Final[str] = "answer_workers"
+CFG_ANSWER_COMPLETION_ORDER: Final[str] = "answer_completion_order"
+
+DEFAULT_ANSWER_LOOKAHEAD: Final[int] = 2  # 超前生成、等待提交的答案数上限
+DEFAULT_ANSWER_WORKERS: Final[int] = 3  # 同时生成答案的线程数
+DEFAULT_ANSWER_COMPLETION_ORDER: Final[bool] = False  # 按生成完成的顺序而非关卡顺序提交
+
+ANSWER_POLL_SLICE: Final[float] = 0.5  # sec, 队列阻塞的切片, 以便及时响应停止
+
+# 答案缓存
+CFG_ANSWER_CACHE_ENABLED: Final[str] = "answer_cache_enabled"
+CFG_ANSWER_CACHE_MAX_ENTRIES: Final[str] = "answer_cache_max_entries"
+CFG_ANSWER_CACHE_MAX_BYTES: Final[str] = "answer_cache_max_bytes"
+CFG_ANSWER_CACHE_TTL: Final[str] = "answer_cache_ttl"
+
+DEFAULT_ANSWER_CACHE_ENABLED: Final[bool] = True
+DEFAULT_ANSWER_CACHE_MAX_ENTRIES: Final[int] = 2000
+DEFAULT_ANSWER_CACHE_MAX_BYTES: Final[int] = 16 * 1024 * 1024  # 答案文字的总字节数
+DEFAULT_ANSWER_CACHE_TTL: Final[float] = 30 * 24 * 3600.0  # sec
+
+# 相似题目索引(MinHash/LSH)
+CFG_SIMILAR_REUSE: Final[str] = "similar_reuse"
+CFG_SIMILAR_REUSE_THRESHOLD: Final[str] = "similar_reuse_threshold"
+
+DEFAULT_SIMILAR_REUSE: Final[bool] = False  # 相似度足够高时直接复用旧答案
+DEFAULT_SIMILAR_REUSE_THRESHOLD: Final[float] = 0.9
+SIMILAR_MIN_SCORE: Final[float] = 0.5  # 低于此估计相似度的候选不给出
+SIMILAR_SHINGLE_SIZE: Final[int] = 5  # 字符
+SIMILAR_BANDS: Final[int] = 16
+SIMILAR_ROWS: Final[int] = 4  # 每段的桶数, 签名长度为SIMILAR_BANDS * SIMILAR_ROWS
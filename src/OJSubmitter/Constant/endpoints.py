@@ -0,0 +1,52 @@
+from enum import Enum, StrEnum
+from typing import Dict, Final, List
+
+# local_config keys
+CFG_OJ_BASE_URLS: Final[str] = "oj_base_urls"
+CFG_TIMEOUTS: Final[str] = "timeouts"
+
+DEFAULT_OJ_BASE_URL: Final[str] = "http://10.88.108.125"
+DEFAULT_OJ_BASE_URLS: Final[List[str]] = [DEFAULT_OJ_BASE_URL]
+
+ENDPOINT_LATENCY_ALPHA: Final[float] = 0.3  # EWMA 平滑系数
+ENDPOINT_MAX_FAILURES: Final[int] = 2  # 连续失败次数达到后标记为不健康
+ENDPOINT_COOLDOWN: Final[float] = 30.0  # sec, 不健康节点的冷却时间
+ENDPOINT_PROBE_INTERVAL: Final[float] = 60.0  # sec
+ENDPOINT_PROBE_TIMEOUT: Final[float] = 3.0  # sec
+
+
+class OJPath(StrEnum):
+    LOGIN_PAGE = "/loginpage.php"
+    LOGIN = "/login.php"
+    STAGE = "/stage.php"
+    PROBLEM = "/sproblem.php"
+    SUBMIT = "/ssubmit.php"
+    STATUS = "/status.php"
+
+
+PROBE_PATH: Final[str] = OJPath.LOGIN_PAGE
+
+
+class Route(Enum):
+    READ = "read"  # 可分发到任意健康镜像
+    SESSION = "session"  # 固定到持有会话的节点
+    LOGIN = "login"  # 可切换节点, 成功后将会话固定到该节点
+
+
+class RemoteEndpoint(StrEnum):
+    CONFIG = "remote:config"
+    AI_ANSWER = "remote:ai_answer"
+
+
+# 各端点单次请求的默认超时(sec), 可由local_config中的timeouts覆盖
+DEFAULT_TIMEOUT: Final[float] = 10.0
+DEFAULT_TIMEOUTS: Final[Dict[str, float]] = {
+    OJPath.LOGIN_PAGE: 5.0,
+    OJPath.LOGIN: 10.0,
+    OJPath.STAGE: 5.0,
+    OJPath.PROBLEM: 8.0,
+    OJPath.SUBMIT: 15.0,
+    OJPath.STATUS: 5.0,
+    RemoteEndpoint.CONFIG: 5.0,
+    RemoteEndpoint.AI_ANSWER: 60.0,
+}
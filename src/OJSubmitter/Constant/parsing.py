@@ -0,0 +1,9 @@
+from typing import Final
+
+# local_config keys
+CFG_PARSE_PROCESSES: Final[str] = "parse_processes"
+CFG_PARSE_OFFLOAD_MIN_BYTES: Final[str] = "parse_offload_min_bytes"
+
+DEFAULT_PARSE_PROCESSES: Final[int] = 0  # 解析进程数, 0为不启用进程池
+# bytes, 不小于该长度的页面才送到解析进程, 更小的页面进程间传输不划算
+DEFAULT_PARSE_OFFLOAD_MIN_BYTES: Final[int] = 64 * 1024
@@ -1 +1,2 @@
 RESOURCE_PATH = "./SavedData/OJSubmitterData.json"
+ANSWER_CACHE_PATH = "./SavedData/AnswerCache.sqlite3"
@@ -0,0 +1,18 @@
+from typing import Final
+
+# local_config keys
+CFG_OJ_UTC_OFFSET: Final[str] = "oj_utc_offset"
+
+DEFAULT_OJ_UTC_OFFSET: Final[float] = 8.0  # hours, OJ页面时间所在时区
+
+# 等待关卡开始
+WAIT_COARSE_MAX: Final[float] = 300.0  # sec, 粗等待单次最长, 到期后重新确认开始时间
+WAIT_BURST_LEAD: Final[float] = 2.0  # sec, 距开始时间多久进入密集轮询
+WAIT_BURST_INTERVAL: Final[float] = 0.25  # sec
+WAIT_BURST_WINDOW: Final[float] = 15.0  # sec, 开始时间之后仍密集轮询的时长
+WAIT_SLEEP_SLICE: Final[float] = 0.5  # sec, 长等待的切片, 以便及时响应停止
+
+# 共享关卡轮询
+WATCH_DEFAULT_INTERVAL: Final[float] = 3.0  # sec
+WATCH_MAX_FAILURES: Final[int] = 5  # 连续失败达到此次数时等待者放弃
+WATCH_LOG_SOURCE: Final[str] = "OJ.stage_watcher"
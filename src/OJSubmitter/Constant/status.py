@@ -12,3 +12,33 @@ class ConfigStatus(enum.Enum):
     SUCCESS = 0
     FETCH_FAILED = 1
     NEED_UPDATE = 2
+
+
+class RunningStatus(enum.StrEnum):
+    NOT_STARTED = "未开始"
+    RUNNING = "运行中"
+    ENDED = "已结束"
+    NO_ACCESS = "关卡被屏蔽或者无权进入"
+
+
+class Verdict(enum.StrEnum):
+    """状态页中的评测结果"""
+
+    PENDING = "等待"
+    PENDING_REJUDGE = "等待重判"
+    COMPILING = "编译中"
+    RUNNING_JUDGING = "运行并评判"
+    SUBMITTING = "提交中"
+    REMOTE_PENDING = "远程等待"
+    REMOTE_JUDGING = "远程判题"
+    MANUAL_CONFIRM = "自动评测通过，等待人工确认"
+    ACCEPTED = "正确"
+    PRESENTATION_ERROR = "格式错误"
+    WRONG_ANSWER = "答案错误"
+    TIME_LIMIT_EXCEEDED = "时间超限"
+    MEMORY_LIMIT_EXCEEDED = "内存超限"
+    OUTPUT_LIMIT_EXCEEDED = "输出超限"
+    RUNTIME_ERROR = "运行错误"
+    COMPILE_ERROR = "编译错误"
+    COMPILE_OK = "编译成功"
+    TEST_RUN = "运行完成"
@@ -0,0 +1,75 @@
+from enum import Enum
+from typing import Dict, Final, Tuple, TypedDict
+
+# local_config keys
+CFG_SESSION_POOL_SIZE: Final[str] = "session_pool_size"
+CFG_SESSION_IDLE_TIMEOUT: Final[str] = "session_idle_timeout"
+CFG_ASYNC_CONCURRENCY: Final[str] = "async_concurrency"
+CFG_RATE_LIMITS: Final[str] = "rate_limits"
+CFG_RESILIENCE: Final[str] = "resilience"
+CFG_STAGE_SNAPSHOT_TTL: Final[str] = "stage_snapshot_ttl"
+CFG_PREFETCH_CONCURRENCY: Final[str] = "prefetch_concurrency"
+
+DEFAULT_SESSION_POOL_SIZE: Final[int] = 32
+DEFAULT_SESSION_IDLE_TIMEOUT: Final[float] = 300.0  # sec
+DEFAULT_CONNECTIONS_PER_SESSION: Final[int] = 16
+DEFAULT_ASYNC_CONCURRENCY: Final[int] = 16
+# sec, 需小于各处轮询关卡状态的间隔
+DEFAULT_STAGE_SNAPSHOT_TTL: Final[float] = 1.0
+DEFAULT_PREFETCH_CONCURRENCY: Final[int] = 8
+
+STREAM_CHUNK_SIZE: Final[int] = 4096  # bytes, 流式检查标记时每次读取的长度
+# bytes, 提前停止时剩余不超过该长度则读完, 以便连接放回连接池复用
+STREAM_DRAIN_MAX: Final[int] = 16384
+
+# 服务器时钟估计
+CLOCK_WINDOW: Final[int] = 64  # 保留的最近样本数
+CLOCK_FILTER_SIZE: Final[int] = 8  # 参与估计的最小往返样本数
+
+
+class TrafficKind(Enum):
+    READ = "read"
+    SUBMIT = "submit"
+
+
+class LimitScope(Enum):
+    HOST = "host"
+    ACCOUNT = "account"
+
+
+# (每秒令牌数, 桶容量)
+DEFAULT_RATE_LIMITS: Final[Dict[TrafficKind, Dict[LimitScope, Tuple[float, float]]]] = {
+    TrafficKind.READ: {
+        LimitScope.HOST: (20.0, 40.0),
+        # 每读一道题还要经`Account.cookie`检查一次登录, 即两个令牌;
+        # 按默认预取并发(8)各带两个请求估算, 一次预取16道题不必等待
+        LimitScope.ACCOUNT: (16.0, 32.0),
+    },
+    TrafficKind.SUBMIT: {
+        LimitScope.HOST: (2.0, 4.0),
+        LimitScope.ACCOUNT: (0.5, 2.0),
+    },
+}
+
+
+class ResilienceParams(TypedDict):
+    max_attempts: int  # 幂等请求的最大尝试次数
+    backoff_base: float  # sec
+    backoff_max: float  # sec
+    breaker_threshold: int  # 连续失败次数达到后熔断
+    breaker_reset: float  # sec, 熔断后进入半开状态的时间
+    hedge_reads: bool  # 是否对慢GET发起对冲请求
+    hedge_percentile: float  # 超过该延迟分位数时发起对冲
+    hedge_min_samples: int
+
+
+DEFAULT_RESILIENCE: Final[ResilienceParams] = ResilienceParams(
+    max_attempts=3,
+    backoff_base=0.3,
+    backoff_max=5.0,
+    breaker_threshold=5,
+    breaker_reset=15.0,
+    hedge_reads=False,
+    hedge_percentile=0.95,
+    hedge_min_samples=20,
+)
@@ -0,0 +1,29 @@
+from typing import Final
+
+from .status import Verdict
+
+# 不会再变化的评测结果
+FINAL_VERDICTS: Final[frozenset[Verdict]] = frozenset(
+    {
+        Verdict.ACCEPTED,
+        Verdict.PRESENTATION_ERROR,
+        Verdict.WRONG_ANSWER,
+        Verdict.TIME_LIMIT_EXCEEDED,
+        Verdict.MEMORY_LIMIT_EXCEEDED,
+        Verdict.OUTPUT_LIMIT_EXCEEDED,
+        Verdict.RUNTIME_ERROR,
+        Verdict.COMPILE_ERROR,
+        Verdict.COMPILE_OK,
+        Verdict.TEST_RUN,
+    }
+)
+
+# 评测结果跟踪
+VERDICT_MIN_INTERVAL: Final[float] = (
+    1.0  # sec, 待定数不少于VERDICT_BATCH_FULL时的轮询间隔
+)
+VERDICT_MAX_INTERVAL: Final[float] = 5.0  # sec
+VERDICT_BATCH_FULL: Final[int] = 4  # 待定数少于此值时按比例拉长间隔
+VERDICT_MAX_PAGES: Final[int] = 3  # 每轮最多翻页数, 用于较早的待定运行号
+VERDICT_TIMEOUT: Final[float] = 600.0  # sec, 超过后以TimeoutError结束跟踪
+VERDICT_LOG_SOURCE: Final[str] = "OJ.verdict_tracker"
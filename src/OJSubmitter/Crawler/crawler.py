@@ -1,26 +1,62 @@
+import functools
 import hashlib
 import re
 import threading
 import time
-from enum import StrEnum
-from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict, cast
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import (
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+)
 
 import requests
-from bs4 import BeautifulSoup, ResultSet, Tag
 
 from ...OJSubmitter.Models.identify import CookieModel
-from ...Typehint.basic import Callback, NonCallback
-from ...Util.functiontools import do_nothing
+from ...Typehint.basic import NonCallback
+from ..Constant.endpoints import OJPath, Route
 from ..Constant.request_consts import LOGGED_TIP, Language
-from ..Constant.status import LoginStatus
+from ..Constant.stage import (
+    CFG_OJ_UTC_OFFSET,
+    DEFAULT_OJ_UTC_OFFSET,
+    WAIT_SLEEP_SLICE,
+)
+from ..Constant.status import LoginStatus, RunningStatus
+from ..Constant.transport import (
+    CFG_PREFETCH_CONCURRENCY,
+    CFG_STAGE_SNAPSHOT_TTL,
+    DEFAULT_PREFETCH_CONCURRENCY,
+    DEFAULT_STAGE_SNAPSHOT_TTL,
+    TrafficKind,
+)
 from ..Resource import Resource
+from ..Transport.aio import async_bridge
+from ..Transport.deadline import Deadline
+from ..Transport.stream import StreamScan, iter_text, scan_response
+from ..Transport.transport import transport
 from ..Typehint.login import LoginReturn
 from ..Typehint.problem import (
     LevelProblemInfo,
     OneProblemContent,
-    OneProblemContentLiteral,
+    PageTiming,
+    StageDiff,
     StageInfo,
+    StageRow,
+    StageSnapshot,
+    VerdictRow,
+    WaitReport,
 )
+from . import parsers
+from .parse_executor import Page, parse_executor
+from .stage_diff import RowKey, diff_snapshots, is_empty, row_key
+from .stage_watcher import WatchKey, stage_watcher
+from .verdict_tracker import VerdictCallback, verdict_tracker
 
 
 class Account:
@@ -29,14 +65,18 @@ class Account:
         self.password = password
         self._cookie = cookie
 
-    def _check_is_login(self, new_cookie: Optional[str] = None) -> bool:
-        url = "http://10.88.108.125/loginpage.php"
-        response = requests.get(
-            url,
+    def _check_is_login(
+        self, new_cookie: Optional[str] = None, deadline: Optional[Deadline] = None
+    ) -> bool:
+        response = transport.get(
+            OJPath.LOGIN_PAGE,
+            key=self.account,
+            route=Route.SESSION,
             cookies={"PHPSESSID": self._cookie if new_cookie is None else new_cookie},
+            deadline=deadline,
+            stream=True,
         )
-        response.encoding = "utf-8"
-        return LOGGED_TIP in response.text
+        return scan_response(response, [LOGGED_TIP])["marker"] is not None
 
     @property
     def is_logined(self) -> bool:
@@ -49,12 +89,20 @@ class Account:
             self._cookie = cookie
         return
 
+    @property
+    def session(self) -> requests.Session:
+        return transport.session(self.account)
+
     def _get_phpsessid(self) -> str:
-        session: requests.Session = requests.Session()
+        session: requests.Session = self.session
+        session.cookies.clear()
         hashed_password: str = hashlib.md5(self.password.encode()).hexdigest()
 
-        response = session.post(
-            url="http://10.88.108.125/login.php",
+        response = transport.post(
+            OJPath.LOGIN,
+            key=self.account,
+            route=Route.LOGIN,
+            idempotent=True,
             data={
                 "user_id": self.account,
                 "password": hashed_password,
@@ -63,8 +111,14 @@ class Account:
         )
         response.raise_for_status()
 
-        phpsessid: str = str(session.cookies.get("PHPSESSID"))
-        return phpsessid
+        # 会话由池共享, 只取本次登录响应(含重定向)设置的cookie
+        for resp in [response, *reversed(response.history)]:
+            phpsessid = resp.cookies.get("PHPSESSID")
+            if phpsessid:
+                return str(phpsessid)
+        raise requests.HTTPError(
+            "Login response did not set PHPSESSID.", response=response
+        )
 
     def login(self) -> LoginReturn:
         try:
@@ -100,8 +154,11 @@ class Account:
 
         return LoginReturn(status=LoginStatus.SUCCESS, message="Logging successful.")
 
-    def check_cookie_valid(self) -> bool:
-        return self._check_is_login()
+    def check_cookie_valid(self, deadline: Optional[Deadline] = None) -> bool:
+        return self._check_is_login(deadline=deadline)
+
+    async def validate(self) -> bool:
+        return await async_bridge.run(self.check_cookie_valid)
 
     @property
     def is_cookie_valid(self) -> bool:
@@ -129,87 +186,133 @@ class Account:
 
 
 class LevelProblemPage:
+    """关卡中的一道题
+
+    题目页在首次读取`page_text`/`page_content`时才请求并解析,
+    需要提前加载时调用`prefetch`.
+    """
+
     def __init__(self, page_info: LevelProblemInfo, account: Account) -> None:
         self.page_info = page_info
         self.account = account
-        self.reload_page()
+        self._lock = threading.Lock()
+        self._page_text: Optional[str] = None
+        self._page_content: Optional[OneProblemContent] = None
+
+    def _load(self, page_text: str) -> None:
+        content = parse_executor.run(parsers.parse_problem_content, page_text)
+        self._page_text, self._page_content = page_text, content
+
+    def _read(
+        self, deadline: Optional[Deadline] = None
+    ) -> Tuple[str, OneProblemContent]:
+        """已加载时直接取用, 否则请求并解析题目页; 只缓存200响应, 其余下次重新请求"""
+        with self._lock:
+            if self._page_text is None or self._page_content is None:
+                page_text = self._get_page(deadline)
+                if page_text is None:
+                    return "", parse_executor.run(parsers.parse_problem_content, "")
+                self._load(page_text)
+                assert self._page_text is not None
+                assert self._page_content is not None
+            return self._page_text, self._page_content
+
+    def reload_page(self, deadline: Optional[Deadline] = None) -> None:
+        page_text = self._get_page(deadline)
+        if page_text is None:
+            return
+        with self._lock:
+            self._load(page_text)
+
+    def prefetch(self, deadline: Optional[Deadline] = None) -> None:
+        """尚未加载时请求并解析题目页"""
+        self._read(deadline)
 
-    def reload_page(self) -> None:
-        self.page_text: str = self.get_page()
-        self.page_content: OneProblemContent = self.parse_page()
+    @property
+    def is_loaded(self) -> bool:
+        return self._page_content is not None
 
-    def get_page(self) -> str:
-        url = f"http://10.88.108.125/sproblem.php?cid={self.page_info['cid']}&pid={self.page_info['pid']}"
-        response = requests.get(url, cookies={"PHPSESSID": self.account.cookie})
-        response.encoding = "utf-8"
+    @property
+    def page_text(self) -> str:
+        return self._read()[0]
+
+    @property
+    def page_content(self) -> OneProblemContent:
+        return self._read()[1]
+
+    def _get_page(self, deadline: Optional[Deadline] = None) -> Optional[str]:
+        """题目页HTML, 非200响应时为None"""
+        response = transport.get(
+            OJPath.PROBLEM,
+            params={"cid": self.page_info["cid"], "pid": self.page_info["pid"]},
+            key=self.account.account,
+            cookies={"PHPSESSID": self.account.cookie},
+            deadline=deadline,
+        )
+        if response.status_code >= 500:
+            response.raise_for_status()
         if response.status_code == 200:
             return response.text
-        return ""
+        return None
 
-    @property
-    def is_problem_running(self) -> bool:
-        page = self.get_page()
-        if "该关卡尚未开始" in page or "请耐心等候" in page:
-            return False
-        self.reload_page()
-        return True
+    def get_page(self, deadline: Optional[Deadline] = None) -> str:
+        page_text = self._get_page(deadline)
+        return "" if page_text is None else page_text
 
     def parse_page(self) -> OneProblemContent:
-        soup = BeautifulSoup(self.page_text, "html.parser")
-        returns: OneProblemContent = OneProblemContent(
-            description="",
-            input="",
-            output="",
-            sample_input="",
-            sample_output="",
-            code_with_filling="",
+        return parse_executor.run(parsers.parse_problem_content, self.page_text)
+
+    def parse_running_id(self, status_page: Page) -> Optional[int]:
+        return parse_executor.run(parsers.parse_running_id, status_page)
+
+    def latest_running_id(self, deadline: Optional[Deadline] = None) -> Optional[int]:
+        """当前账号在本关卡最新一次提交的运行号"""
+        resp = transport.get(
+            OJPath.STATUS,
+            params={"user_id": self.account.account, "cid": self.page_info["cid"]},
+            key=self.account.account,
+            route=Route.SESSION,
+            cookies={"PHPSESSID": self.account.cookie},
+            deadline=deadline,
         )
-
-        def get_section_by_h2(title: str) -> str:
-            h2: Optional[Tag] = soup.find("h2", string=cast(Any, title))
-            if not h2:
-                return ""
-            content_div = h2.find_next_sibling("div", class_="content")
-            if not content_div:
-                return ""
-            sample_span = content_div.find("span", class_="sampledata")
-            if sample_span:
-                return sample_span.get_text(strip=True)
-            pre = content_div.find("pre")
-            if pre:
-                return pre.get_text()
-            return content_div.get_text(strip=True)
-
-        mp = {
-            "题目描述": "description",
-            "输入": "input",
-            "输出": "output",
-            "样例输入": "sample_input",
-            "样例输出": "sample_output",
-            "带填充标签的C/C++原程序": "code_with_filling",
+        resp.raise_for_status()
+        return self.parse_running_id(resp.content)
+
+    def status_rows(
+        self, top: Optional[int] = None, deadline: Optional[Deadline] = None
+    ) -> List[VerdictRow]:
+        """当前账号在本关卡的一页提交记录, `top`为本页最大运行号"""
+        params: Dict[str, str | int] = {
+            "user_id": self.account.account,
+            "cid": self.page_info["cid"],
         }
+        if top is not None:
+            params["top"] = top
+        resp = transport.get(
+            OJPath.STATUS,
+            params=params,
+            key=self.account.account,
+            route=Route.SESSION,
+            cookies={"PHPSESSID": self.account.cookie},
+            deadline=deadline,
+        )
+        resp.raise_for_status()
+        return parse_executor.run(parsers.parse_status_rows, resp.content)
+
+    def track_verdict(
+        self, running_id: int, callback: Optional[VerdictCallback] = None
+    ) -> "Future[VerdictRow]":
+        """登记运行号, 与同账号同关卡的其他提交一起批量查询评测结果"""
+        return verdict_tracker.track(
+            (self.account.account, self.page_info["cid"]),
+            running_id,
+            self.status_rows,
+            callback,
+        )
 
-        for cn, en in mp.items():
-            returns[cast(OneProblemContentLiteral, en)] = get_section_by_h2(cn)
-
-        return returns
-
-    def parse_running_id(self, status_page: str) -> Optional[int]:
-        soup = BeautifulSoup(status_page, "html.parser")
-        result_table = soup.find("table", id="result-tab")
-        if not result_table:
-            return None
-        instances = result_table.find_all("tr", class_=re.compile("^(evenrow|oddrow)$"))
-        if not instances:
-            return None
-        first_instance = instances[0]
-        tds = first_instance.find_all("td")
-        if len(tds) < 1:
-            return None
-        running_id_str: str = tds[0].get_text(strip=True)
-        if not running_id_str.isdigit():
-            return None
-        return int(running_id_str)
+    async def fetch(self) -> OneProblemContent:
+        await async_bridge.run(self.reload_page)
+        return self.page_content
 
     def get_full_content(self, language: Language) -> str:
         if not self.page_content.get("description"):
@@ -227,7 +330,18 @@ class LevelProblemPage:
         code: str,
         language_id: int,
         fetch_running_id: bool = False,
+        retry: bool = False,
+        deadline: Optional[Deadline] = None,
+        on_verdict: Optional[VerdictCallback] = None,
     ) -> Optional[int]:
+        """提交代码
+
+        NOTE: 提交不会被自动重试. 若`retry`为True, 提交前记录最新运行号,
+        失败后仅当状态页确认该提交未被接收时才重试(会额外请求状态页).
+        `deadline`约束整个提交过程(包括状态页查询与重试).
+        给出`on_verdict`时另行查询本账号的最新运行号并交给`verdict_tracker`跟踪评测结果.
+        """
+        deadline = Deadline.resolve(deadline)
         code = re.sub(r'(?<![\'"])\n', "\r\n", code)
         form: Dict[str, str | int] = {
             "cid": self.page_info["cid"],
@@ -242,41 +356,116 @@ class LevelProblemPage:
             "PHPSESSID": f"{self.account.cookie}",
         }
 
-        resp: requests.Response = requests.post(
-            url="http://10.88.108.125/ssubmit.php",
+        idempotency_check: Optional[Callable[[], bool]] = None
+        if retry:
+            baseline = self.latest_running_id(deadline)
+
+            def idempotency_check() -> bool:
+                return self.latest_running_id(deadline) == baseline
+
+        resp: requests.Response = transport.post(
+            OJPath.SUBMIT,
+            key=self.account.account,
+            kind=TrafficKind.SUBMIT,
+            idempotency_check=idempotency_check,
             data=form,
             headers=headers,
             cookies=cookies,
+            deadline=deadline,
         )
-        resp.encoding = "utf-8"
         resp.raise_for_status()
 
+        if on_verdict is not None:
+            # 提交后的状态页未按账号过滤, 首行可能是他人的提交
+            running_id = self.latest_running_id(deadline)
+            if running_id is not None:
+                self.track_verdict(running_id, on_verdict)
+            return running_id
+
         if fetch_running_id:
-            page = resp.text
-            return self.parse_running_id(page)
+            return self.parse_running_id(resp.text)
 
         return None
 
+    async def submit(
+        self,
+        code: str,
+        language_id: int,
+        fetch_running_id: bool = False,
+        retry: bool = False,
+    ) -> Optional[int]:
+        return await async_bridge.run(
+            self.submit_code, code, language_id, fetch_running_id, retry
+        )
+
     def __repr__(self) -> str:
         return f"LevelProblemPage(page_info={self.page_info}, cookie={self.account.cookie})"
 
 
+def prefetch_pages(
+    pages: List[LevelProblemPage],
+    concurrency: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+) -> List[PageTiming]:
+    """在最多`concurrency`个线程中并发加载题目页, 按`pages`顺序返回各页耗时
+
+    单页失败不会抛出, 记录在返回值中, 该页之后读取时会再次尝试加载.
+    """
+    if concurrency is None:
+        concurrency = int(
+            Resource().local_config_get(
+                CFG_PREFETCH_CONCURRENCY, DEFAULT_PREFETCH_CONCURRENCY
+            )
+        )
+    deadline = Deadline.resolve(deadline)
+
+    def load(page: LevelProblemPage) -> PageTiming:
+        start = time.monotonic()
+        error = ""
+        try:
+            page.prefetch(deadline)
+        except requests.RequestException as e:
+            error = str(e)
+        return PageTiming(
+            pid=page.page_info["pid"],
+            topic=page.page_info["topic"],
+            elapsed=time.monotonic() - start,
+            ok=not error,
+            error=error,
+        )
+
+    if not pages:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(concurrency, len(pages))),
+        thread_name_prefix="oj-prefetch",
+    ) as executor:
+        return list(executor.map(load, pages))
+
+
 class ProblemPackage(TypedDict):
     page: LevelProblemPage
     finished: bool
 
 
-class RunningStatus(StrEnum):
-    NOT_STARTED = "未开始"
-    RUNNING = "运行中"
-    ENDED = "已结束"
-    NO_ACCESS = "关卡被屏蔽或者无权进入"
-
-
 class ProblemGroup:
     def __init__(self, stage: StageInfo, account: Account) -> None:
         self.stage: StageInfo = stage
         self.account: Account = account
+        self.snapshot_ttl = float(
+            Resource().local_config_get(
+                CFG_STAGE_SNAPSHOT_TTL, DEFAULT_STAGE_SNAPSHOT_TTL
+            )
+        )
+        self.utc_offset = float(
+            Resource().local_config_get(CFG_OJ_UTC_OFFSET, DEFAULT_OJ_UTC_OFFSET)
+        )
+        self.last_wait_report: Optional[WaitReport] = None
+        self._lock = threading.Lock()
+        self._snapshot: Optional[StageSnapshot] = None
+        self._snapshot_at = 0.0
+        self._pages: Dict[RowKey, LevelProblemPage] = {}
+        self._subscribers: List[Callable[[StageDiff], None]] = []
 
     @property
     def problems(self) -> List[LevelProblemPage]:
@@ -284,115 +473,296 @@ class ProblemGroup:
 
         return [ppack["page"] for ppack in pws]
 
-    @property
-    def problem_with_states(self) -> List[ProblemPackage]:
-        url = f"http://10.88.108.125/stage.php?cid={self.stage['cid']}"
-        resp = requests.get(url, cookies={"PHPSESSID": self.account.cookie})
-        resp.encoding = "utf-8"
-        if resp.status_code == 200:
-            soup: BeautifulSoup = BeautifulSoup(resp.text, "html.parser")
-            problem_rows: List[Tag] = soup.select("#problemset tbody tr")
-            problems: List[ProblemPackage] = []
-            for index, row in enumerate(problem_rows):
-                tds = row.find_all("td")
-                if len(tds) < 1:
-                    continue
+    def _get_stage_page(
+        self, deadline: Optional[Deadline] = None, stream: bool = False
+    ) -> requests.Response:
+        resp = transport.get(
+            OJPath.STAGE,
+            params={"cid": self.stage["cid"]},
+            key=self.account.account,
+            cookies={"PHPSESSID": self.account.cookie},
+            deadline=deadline,
+            stream=stream,
+        )
+        if resp.status_code >= 500:
+            resp.close()
+            resp.raise_for_status()
+        return resp
 
+    def _scan_stage_page(
+        self,
+        markers: List[str],
+        keep_text: bool = False,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[StreamScan, int]:
+        """流式读取关卡页直到任一标记出现, 返回(读取结果, 状态码)"""
+        resp = self._get_stage_page(deadline, stream=True)
+        return scan_response(resp, markers, keep_text), resp.status_code
+
+    def _make_page(self, row: StageRow) -> LevelProblemPage:
+        """同一行在多次刷新间复用同一页面对象, 保留已加载的内容"""
+        with self._lock:
+            page = self._pages.get(row_key(row))
+            if page is None:
                 lpi = LevelProblemInfo(
                     level_mode=True,
                     cid=self.stage["cid"],
-                    pid=index,
-                    topic=tds[2].get_text(strip=True),
-                )
-                ppage = LevelProblemPage(
-                    page_info=lpi,
-                    account=self.account,
+                    pid=row["pid"],
+                    topic=row["topic"],
                 )
+                page = LevelProblemPage(page_info=lpi, account=self.account)
+                self._pages[row_key(row)] = page
+            return page
 
-                ppack = ProblemPackage(
-                    page=ppage,
-                    finished=tds[0].get_text(strip=True) == "Y",
-                )
-                problems.append(ppack)
-            return problems
-        return []
+    def subscribe(self, fn: Callable[[StageDiff], None]) -> NonCallback:
+        """订阅关卡变化, 每次刷新有变化时以差异调用`fn`(在刷新所在线程中)
 
-    @property
-    def running_status(self) -> RunningStatus:
-        url = f"http://10.88.108.125/stage.php?cid={self.stage['cid']}"
-        resp = requests.get(url, cookies={"PHPSESSID": self.account.cookie})
-        resp.encoding = "utf-8"
+        Returns:
+            NonCallback: 取消订阅的函数
+        """
+        with self._lock:
+            self._subscribers.append(fn)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if fn in self._subscribers:
+                    self._subscribers.remove(fn)
+
+        return unsubscribe
+
+    def fetch(self, deadline: Optional[Deadline] = None) -> StageSnapshot:
+        """请求并解析关卡页, 不更新本对象的快照"""
+        resp = self._get_stage_page(deadline)
+        parse = functools.partial(
+            parsers.parse_stage_snapshot,
+            self.stage["cid"],
+            status_code=resp.status_code,
+            utc_offset=self.utc_offset,
+        )
+        return parse_executor.run(parse, resp.content)
+
+    def probe(self, deadline: Optional[Deadline] = None) -> RunningStatus:
+        """只判断关卡运行状态的轻量检查, 不解析题目列表也不更新快照
 
-        if RunningStatus.NO_ACCESS in resp.text:
+        流式读取关卡页, 读到无权限提示或题目列表(状态一定在其之前)即停止.
+        """
+        scan, status_code = self._scan_stage_page(
+            [RunningStatus.NO_ACCESS, *parsers.STAGE_TABLE_MARKERS],
+            keep_text=True,
+            deadline=deadline,
+        )
+        if scan["marker"] == RunningStatus.NO_ACCESS:
             return RunningStatus.NO_ACCESS
+        return parsers.parse_running_status(scan["text"], status_code)
+
+    def refresh(self, deadline: Optional[Deadline] = None) -> StageSnapshot:
+        """重新请求关卡页并更新快照, 有变化时通知订阅者"""
+        return self._store(self.fetch(deadline))
+
+    def _store(self, snapshot: StageSnapshot) -> StageSnapshot:
+        with self._lock:
+            diff = diff_snapshots(self._snapshot, snapshot)
+            self._snapshot = snapshot
+            self._snapshot_at = time.monotonic()
+            for row in diff["removed"]:
+                self._pages.pop(row_key(row), None)
+            subscribers = list(self._subscribers)
+
+        if not is_empty(diff):
+            for fn in subscribers:
+                fn(diff)
+        return snapshot
+
+    def _fresh_snapshot(self) -> Optional[StageSnapshot]:
+        with self._lock:
+            if time.monotonic() - self._snapshot_at < self.snapshot_ttl:
+                return self._snapshot
+            return None
+
+    @property
+    def last_snapshot(self) -> Optional[StageSnapshot]:
+        """最近一次保存的快照(可能已过期), 从不发起请求"""
+        with self._lock:
+            return self._snapshot
+
+    @property
+    def snapshot(self) -> StageSnapshot:
+        """关卡页快照, `snapshot_ttl`秒内的重复访问不会再次请求"""
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None:
+            return snapshot
+        return self.refresh()
+
+    def iter_problem_rows(
+        self, deadline: Optional[Deadline] = None
+    ) -> Generator[ProblemPackage, None, None]:
+        """逐行产出题目, 首行的等待时间与关卡题目数无关
+
+        有新鲜快照时直接取用; 否则流式读取关卡页, 每读完一个<tr>即产出,
+        全部读完后更新快照(有变化时通知订阅者). 提前停止迭代时不更新快照.
+        """
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None:
+            for row in snapshot["rows"]:
+                yield ProblemPackage(
+                    page=self._make_page(row), finished=row["finished"]
+                )
+            return
+
+        resp = self._get_stage_page(deadline, stream=True)
+        parts: List[str] = []
+        rows: List[StageRow] = []
+
+        def chunks() -> Iterator[str]:
+            for chunk in iter_text(resp):
+                parts.append(chunk)
+                yield chunk
+
+        try:
+            if resp.status_code == 200:
+                for row in parsers.iter_stage_rows(chunks()):
+                    rows.append(row)
+                    yield ProblemPackage(
+                        page=self._make_page(row), finished=row["finished"]
+                    )
+            else:
+                parts.extend(chunks())
+        finally:
+            resp.close()
+
+        self._store(
+            parsers.parse_stage_snapshot(
+                self.stage["cid"],
+                "".join(parts),
+                resp.status_code,
+                self.utc_offset,
+                rows=rows,
+            )
+        )
 
-        if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, "html.parser")
-            center_divs: ResultSet[Tag] = soup.select("#main center")
-            for center in center_divs:
-                status_spans = center.find_all("span")
-                for span in status_spans:
-                    span_text = span.get_text(strip=True)
-                    if RunningStatus.RUNNING in span_text:
-                        return RunningStatus.RUNNING
-                    elif RunningStatus.ENDED in span_text:
-                        return RunningStatus.ENDED
+    @property
+    def problem_with_states(self) -> List[ProblemPackage]:
+        return [
+            ProblemPackage(page=self._make_page(row), finished=row["finished"])
+            for row in self.snapshot["rows"]
+        ]
 
-        return RunningStatus.NOT_STARTED
+    @property
+    def running_status(self) -> RunningStatus:
+        """有新鲜快照时直接取用, 否则只做流式的状态检查"""
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None:
+            return snapshot["status"]
+        return self.probe()
 
     @property
     def is_running(self) -> bool:
         status = self.running_status
         return status == RunningStatus.RUNNING
 
+    def prefetch_pages(
+        self,
+        pages: Optional[List[LevelProblemPage]] = None,
+        concurrency: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> List[PageTiming]:
+        """并发加载`pages`(默认为当前全部题目), 见`prefetch_pages`"""
+        return prefetch_pages(
+            self.problems if pages is None else pages, concurrency, deadline
+        )
+
     @property
     def is_existing(self) -> bool:
-        url = f"http://10.88.108.125/stage.php?cid={self.stage['cid']}"
-        resp = requests.get(url, cookies={"PHPSESSID": self.account.cookie})
-        resp.encoding = "utf-8"
-        if "没有这样的关卡!" in resp.text:
-            return False
-        return True
+        """有新鲜快照时直接取用, 否则流式读取到"不存在"提示或题目列表为止"""
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None:
+            return snapshot["existing"]
+        scan, _ = self._scan_stage_page(
+            [parsers.STAGE_NOT_FOUND_TIP, *parsers.STAGE_TABLE_MARKERS]
+        )
+        return scan["marker"] != parsers.STAGE_NOT_FOUND_TIP
+
+    async def fetch_snapshot(self) -> StageSnapshot:
+        """异步版本的`refresh`"""
+        return await async_bridge.run(self.refresh)
+
+    @property
+    def watch_key(self) -> WatchKey:
+        return (
+            self.stage["cid"],
+            transport.endpoints.session_host(self.account.account),
+            self.account.account,
+        )
 
-    def wait_for_start(
+    def wait_until_started(
         self,
-        next_fn: Optional[Callback] = None,
-        callback: Optional[Callable[..., Any]] = None,
         interval: float = 3.0,
-    ) -> Optional[Tuple[NonCallback, Optional[int]]]:
-        """等待关卡开始运行
+        should_stop: Optional[Callable[[], bool]] = None,
+        on_poll: Optional[NonCallback] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> WaitReport:
+        """阻塞直到关卡开始, 结束, 无权进入, 确认不存在或轮询连续失败
 
+        轮询由`stage_watcher`按(关卡, 节点, 账号)共享, 多个等待者不会重复请求.
+        等待结束后以共享的最新快照更新本对象(并通知订阅者).
 
-        NOTE: 如果callback为None, 则为同步调用. 否则为其创建一个线程(stl thread).
         Args:
-            next_fn (Optional[Callback], optional): 每次轮询前调用的函数. Defaults to None.
-            callback (Optional[Callable[..., Any]], optional): 关卡开始后调用的函数. Defaults to None.
-            interval (float, optional): 轮询间隔. Defaults to 3.0. sec
-
-        Returns:
-            Optional[Tuple[NonCallback, Optional[int]]]: 如果没有callback 则返回停止函数和线程ID. 否则返回None.
+            interval (float, optional): 未知开始时间时的轮询间隔, 以及调用`on_poll`的间隔. Defaults to 3.0. sec
+            should_stop (Optional[Callable[[], bool]], optional): 返回True时停止等待. Defaults to None.
+            on_poll (Optional[NonCallback], optional): 等待期间定期调用的函数. Defaults to None.
+            deadline (Optional[Deadline], optional): 等待的截止时间. Defaults to None.
         """
-        next_fn = next_fn or do_nothing
-
-        run = True
-
-        def loop() -> None:
-            while run:
-                if self.is_running:
+        deadline = Deadline.resolve(deadline)
+        key = self.watch_key
+        future = stage_watcher.until(
+            key, self.fetch, interval=interval, probe=self.probe
+        )
+        began = time.monotonic()
+        next_poll = began
+        report: Optional[WaitReport] = None
+        try:
+            while report is None:
+                if should_stop is not None and should_stop():
                     break
-                next_fn()
-                time.sleep(interval)
-            if callback is not None:
-                callback()
-
-        def stop() -> None:
-            nonlocal run
-            run = False
-
-        if callback is None:
-            loop()
-            return None
-
-        t = threading.Thread(target=loop, daemon=True)
-        t.start()
-        return stop, t.ident
+                if deadline is not None and deadline.expired:
+                    break
+                if on_poll is not None and time.monotonic() >= next_poll:
+                    on_poll()
+                    next_poll += interval
+                timeout = WAIT_SLEEP_SLICE
+                if deadline is not None:
+                    timeout = max(0.0, min(timeout, deadline.remaining()))
+                try:
+                    report = future.result(timeout)
+                except FutureTimeoutError:
+                    continue
+        finally:
+            # 正常结束时快照在报告中; 被停止时仍在订阅, 取消前取出共享快照
+            snapshot = (
+                stage_watcher.snapshot(key) if report is None else report["snapshot"]
+            )
+            future.cancel()
+
+        if snapshot is not None:
+            self._store(snapshot)
+        if report is None:
+            report = WaitReport(
+                cid=self.stage["cid"],
+                status=(
+                    RunningStatus.NOT_STARTED
+                    if snapshot is None
+                    else snapshot["status"]
+                ),
+                existing=True if snapshot is None else snapshot["existing"],
+                start_at=None if snapshot is None else snapshot["start_at"],
+                detected_at=None,
+                reaction_latency=None,
+                requests=0,
+                burst_requests=0,
+                waited=time.monotonic() - began,
+                errors=0,
+                error="",
+                snapshot=snapshot,
+            )
+        self.last_wait_report = report
+        return report
@@ -0,0 +1,358 @@
+from html.parser import HTMLParser
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union
+
+from ..Typehint.problem import OneProblemContent
+
+# 与BeautifulSoup(html.parser)一致: 这些标签没有结束标签, 也不会成为父节点
+VOID_ELEMENTS = frozenset(
+    {
+        "area",
+        "base",
+        "basefont",
+        "bgsound",
+        "br",
+        "col",
+        "command",
+        "embed",
+        "frame",
+        "hr",
+        "image",
+        "img",
+        "input",
+        "isindex",
+        "keygen",
+        "link",
+        "menuitem",
+        "meta",
+        "nextid",
+        "param",
+        "source",
+        "spacer",
+        "track",
+        "wbr",
+    }
+)
+# get_text()不计入这些标签中的文字
+NON_TEXT_ELEMENTS = frozenset({"script", "style", "template"})
+
+
+class _Ignored(str):
+    """注释等不计入文字, 但仍算作子节点的内容"""
+
+
+class _Node:
+    __slots__ = ("name", "classes", "children")
+
+    def __init__(self, name: str, classes: List[str]) -> None:
+        self.name = name
+        self.classes = classes
+        self.children: List[Union[str, "_Node"]] = []
+
+    def string(self) -> Optional[str]:
+        """等价于bs4的Tag.string"""
+        if len(self.children) != 1:
+            return None
+        child = self.children[0]
+        if isinstance(child, _Node):
+            return child.string()
+        return child
+
+    def strings(self) -> List[str]:
+        out: List[str] = []
+        for child in self.children:
+            if isinstance(child, _Node):
+                out.extend(child.strings())
+            elif not isinstance(child, _Ignored):
+                out.append(child)
+        return out
+
+    def text(self, strip: bool = False) -> str:
+        if not strip:
+            return "".join(self.strings())
+        return "".join(s.strip() for s in self.strings() if s.strip())
+
+    def find(self, name: str, cls: Optional[str] = None) -> Optional["_Node"]:
+        for child in self.children:
+            if not isinstance(child, _Node):
+                continue
+            if child.name == name and (cls is None or cls in child.classes):
+                return child
+            found = child.find(name, cls)
+            if found is not None:
+                return found
+        return None
+
+
+class _Capture:
+    """只为感兴趣的元素建立子树"""
+
+    def __init__(self, root: _Node, depth: int) -> None:
+        self.root = root
+        self.depth = depth  # root所在的栈深度
+        self.stack = [root]
+
+    @property
+    def top(self) -> _Node:
+        return self.stack[-1]
+
+    def open(self, node: _Node) -> None:
+        self.stack.append(node)
+
+
+class _TreeScanner(HTMLParser):
+    """按BeautifulSoup(html.parser)的规则维护元素栈, 但不建立树
+
+    子类通过`_open`/`_closed`/`_text`只记录自己关心的部分.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._stack: List[str] = []
+        self._in_text = False  # 上一个事件是否为文字, 任何标签都会截断字符串
+        self._closed_void: List[str] = []  # 已自动关闭, 尚未遇到结束标签的空元素
+
+    def _open(
+        self, tag: str, classes: List[str], element_id: Optional[str], depth: int
+    ) -> None:
+        """元素`tag`在栈深度`depth`处开始"""
+
+    def _closed(self, depth: int) -> None:
+        """深度不小于`depth`的元素已全部结束"""
+
+    def _text(self, data: str, ignored: bool, merge: bool) -> None:
+        """文字; `merge`为True时与上一段文字属于同一字符串"""
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._start(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            # 与bs4一致: 立即关闭, 并吞掉随后的一个同名结束标签
+            self._end(tag, check_closed=False)
+            self._closed_void.append(tag)
+
+    def handle_startendtag(
+        self, tag: str, attrs: List[Tuple[str, Optional[str]]]
+    ) -> None:
+        self._start(tag, attrs)
+        self._end(tag, check_closed=False)
+
+    def handle_endtag(self, tag: str) -> None:
+        self._end(tag)
+
+    def _start(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._in_text = False
+        classes: List[str] = []
+        element_id: Optional[str] = None
+        for k, v in attrs:
+            if k == "class" and v:
+                classes = v.split()
+            elif k == "id":
+                element_id = v or ""
+        self._open(tag, classes, element_id, len(self._stack))
+        self._stack.append(tag)
+
+    def _end(self, tag: str, check_closed: bool = True) -> None:
+        if check_closed and tag in self._closed_void:
+            self._closed_void.remove(tag)
+            return
+        self._in_text = False
+        if tag not in self._stack:
+            return
+        index = len(self._stack) - 1 - self._stack[::-1].index(tag)
+        self._pop(index)
+
+    def _pop(self, depth: int) -> None:
+        del self._stack[depth:]
+        self._closed(depth)
+
+    def handle_data(self, data: str) -> None:
+        ignored = bool(self._stack) and self._stack[-1] in NON_TEXT_ELEMENTS
+        self._text(data, ignored, self._in_text)
+        self._in_text = True
+
+    def handle_comment(self, data: str) -> None:
+        self._text(data, True, False)
+        self._in_text = False
+
+    def close(self) -> None:
+        super().close()
+        self._pop(0)
+
+
+class ProblemPageExtractor(_TreeScanner):
+    """单次扫描sproblem.php, 提取各节内容
+
+    结果与`parsers.parse_problem_content_soup`一致: 取第一个文字恰为节标题的h2,
+    其后第一个class含content的兄弟div; 其中有span.sampledata时取其去空白文字,
+    否则有pre时取pre原文, 否则取div去空白文字. 只为h2与候选div建立子树.
+    """
+
+    def __init__(self, sections: Dict[str, str]) -> None:
+        super().__init__()
+        self.sections = sections
+        self.result: Dict[str, str] = {en: "" for en in sections.values()}
+        self._resolved: Set[str] = set()  # 已找到h2的节标题
+        self._h2: List[_Capture] = []
+        self._divs: List[Tuple[str, _Capture]] = []
+        self._seeking: List[Tuple[str, int]] = []  # (节, h2所在深度)
+
+    def _captures(self) -> List[_Capture]:
+        return self._h2 + [c for _, c in self._divs]
+
+    def _tops(self) -> List[_Node]:
+        """各子树当前的父节点; 子树相互嵌套时同一节点只计一次"""
+        tops: Dict[int, _Node] = {}
+        for capture in self._captures():
+            tops.setdefault(id(capture.top), capture.top)
+        return list(tops.values())
+
+    def _text(self, data: str, ignored: bool, merge: bool) -> None:
+        for top in self._tops():
+            children = top.children
+            if merge and not ignored and children and type(children[-1]) is str:
+                children[-1] += data
+            else:
+                children.append(_Ignored(data) if ignored else data)
+
+    def _open(
+        self, tag: str, classes: List[str], element_id: Optional[str], depth: int
+    ) -> None:
+        node = _Node(tag, classes)
+        for top in self._tops():
+            top.children.append(node)
+        for capture in self._captures():
+            capture.open(node)
+
+        if tag == "div" and "content" in classes:
+            for seeking in [s for s in self._seeking if s[1] == depth]:
+                self._seeking.remove(seeking)
+                self._divs.append((seeking[0], _Capture(node, depth)))
+        if tag == "h2":
+            self._h2.append(_Capture(node, depth))
+
+    def _closed(self, depth: int) -> None:
+        """结束其中的子树"""
+        for capture in self._captures():
+            del capture.stack[max(1, depth - capture.depth) :]
+
+        for capture in [c for c in self._h2 if c.depth >= depth]:
+            self._h2.remove(capture)
+            self._close_h2(capture)
+        for title, capture in [d for d in self._divs if d[1].depth >= depth]:
+            self._divs.remove((title, capture))
+            self._close_div(title, capture)
+        # 父元素关闭后不再有后续兄弟
+        self._seeking = [s for s in self._seeking if s[1] <= len(self._stack)]
+
+    def _close_h2(self, capture: _Capture) -> None:
+        title = capture.root.string()
+        if title in self.sections and title not in self._resolved:
+            self._resolved.add(title)
+            self._seeking.append((title, capture.depth))
+
+    def _close_div(self, title: str, capture: _Capture) -> None:
+        div = capture.root
+        sample = div.find("span", "sampledata")
+        if sample is not None:
+            text = sample.text(strip=True)
+        else:
+            pre = div.find("pre")
+            text = pre.text() if pre is not None else div.text(strip=True)
+        self.result[self.sections[title]] = text
+
+    def extract(self, page_text: str) -> OneProblemContent:
+        self.feed(page_text)
+        self.close()
+        return OneProblemContent(
+            description=self.result.get("description", ""),
+            input=self.result.get("input", ""),
+            output=self.result.get("output", ""),
+            sample_input=self.result.get("sample_input", ""),
+            sample_output=self.result.get("sample_output", ""),
+            code_with_filling=self.result.get("code_with_filling", ""),
+        )
+
+
+class TableCellsExtractor(_TreeScanner):
+    """扫描表格, 按文档顺序给出`section`(如tbody)中每个tr的各td去空白文字
+
+    与bs4的`select("[#<scope_id>] <section> tr")`逐行`find_all("td")`再
+    `get_text(strip=True)`一致; `section`为None时取`scope_id`内的所有tr,
+    给出`row_classes`时只取class含其中之一的tr. 可分块`feed`, 用
+    `pop_completed`取出已结束的行.
+    """
+
+    def __init__(
+        self,
+        section: Optional[str] = "tbody",
+        scope_id: Optional[str] = None,
+        row_classes: Optional[FrozenSet[str]] = None,
+    ) -> None:
+        super().__init__()
+        self.section = section
+        self.scope_id = scope_id
+        self.row_classes = row_classes
+        self.rows: List[List[List[str]]] = []  # 行 -> 单元格 -> 字符串
+        self._emitted = 0
+        self._scopes: List[int] = []  # 打开的id为scope_id的元素所在深度
+        self._sections: List[int] = []  # 打开的section所在深度
+        self._open_rows: List[Tuple[int, List[List[str]]]] = []
+        self._open_cells: List[Tuple[int, List[str]]] = []
+
+    def _open(
+        self, tag: str, classes: List[str], element_id: Optional[str], depth: int
+    ) -> None:
+        in_scope = self.scope_id is None or bool(self._scopes)
+        in_section = bool(self._sections) if self.section is not None else in_scope
+        if tag == self.section and in_scope:
+            self._sections.append(depth)
+        elif (
+            tag == "tr"
+            and in_section
+            and (self.row_classes is None or not self.row_classes.isdisjoint(classes))
+        ):
+            row: List[List[str]] = []
+            self.rows.append(row)
+            self._open_rows.append((depth, row))
+        elif tag == "td":
+            cell: List[str] = []
+            for _, open_row in self._open_rows:
+                open_row.append(cell)
+            self._open_cells.append((depth, cell))
+        if self.scope_id is not None and element_id == self.scope_id:
+            self._scopes.append(depth)
+
+    def _closed(self, depth: int) -> None:
+        self._scopes = [d for d in self._scopes if d < depth]
+        self._sections = [d for d in self._sections if d < depth]
+        self._open_rows = [r for r in self._open_rows if r[0] < depth]
+        self._open_cells = [c for c in self._open_cells if c[0] < depth]
+
+    def _text(self, data: str, ignored: bool, merge: bool) -> None:
+        if ignored:
+            return
+        for _, cell in self._open_cells:
+            if merge and cell:
+                cell[-1] += data
+            else:
+                cell.append(data)
+
+    @staticmethod
+    def _cell_texts(row: List[List[str]]) -> List[str]:
+        return ["".join(s.strip() for s in cell) for cell in row]
+
+    def pop_completed(self) -> List[List[str]]:
+        """自上次调用以来, 按文档顺序已经结束的行(其前面的行都已结束)"""
+        open_rows = {id(row) for _, row in self._open_rows}
+        start = self._emitted
+        while (
+            self._emitted < len(self.rows)
+            and id(self.rows[self._emitted]) not in open_rows
+        ):
+            self._emitted += 1
+        return [self._cell_texts(row) for row in self.rows[start : self._emitted]]
+
+    def extract(self, fragment: str) -> List[List[str]]:
+        """各行各单元格的去空白文字"""
+        self.feed(fragment)
+        self.close()
+        return [self._cell_texts(row) for row in self.rows]
@@ -0,0 +1,150 @@
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, List, Optional, TypeVar, Union
+
+from ..Constant.parsing import (
+    CFG_PARSE_OFFLOAD_MIN_BYTES,
+    CFG_PARSE_PROCESSES,
+    DEFAULT_PARSE_OFFLOAD_MIN_BYTES,
+    DEFAULT_PARSE_PROCESSES,
+)
+from ..Resource import Resource
+
+T = TypeVar("T")
+Page = Union[str, bytes]
+
+
+def _as_text(page: Page) -> str:
+    return page.decode("utf-8", "replace") if isinstance(page, bytes) else page
+
+
+def _parse(fn: Callable[[str], T], page: Page) -> T:
+    """在解析进程中执行"""
+    return fn(_as_text(page))
+
+
+class ParseExecutor:
+    """HTML解析的执行器
+
+    启用进程池时, 不小于`min_size`的页面(原始字节)送到解析进程, 只传回
+    OneProblemContent/StageSnapshot等纯数据, 解析不再占用本进程的GIL;
+    更小的页面与未启用时在调用方线程中直接解析. `fn`须可被pickle
+    (模块级函数或其functools.partial). 进程池在首次需要时才创建,
+    进程池损坏时退回本进程解析并在下次重建.
+    """
+
+    def __init__(
+        self,
+        processes: int = DEFAULT_PARSE_PROCESSES,
+        min_size: int = DEFAULT_PARSE_OFFLOAD_MIN_BYTES,
+    ) -> None:
+        self.processes = max(0, processes)
+        self.min_size = min_size
+        self.offloaded = 0
+        self.inline = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def from_resource(resource: Resource) -> "ParseExecutor":
+        return ParseExecutor(
+            processes=int(
+                resource.local_config_get(CFG_PARSE_PROCESSES, DEFAULT_PARSE_PROCESSES)
+            ),
+            min_size=int(
+                resource.local_config_get(
+                    CFG_PARSE_OFFLOAD_MIN_BYTES, DEFAULT_PARSE_OFFLOAD_MIN_BYTES
+                )
+            ),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def should_offload(self, page: Page) -> bool:
+        """字符串按字符数近似字节数"""
+        return self.enabled and len(page) >= self.min_size
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.processes)
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run_inline(self, fn: Callable[[str], T], page: Page) -> T:
+        with self._lock:
+            self.inline += 1
+        return fn(_as_text(page))
+
+    def submit(self, fn: Callable[[str], T], page: Page) -> "Future[T]":
+        """提交解析; 不送往进程池时在当前线程解析完毕后返回已完成的Future"""
+        if self.should_offload(page):
+            pool = self._get_pool()
+            try:
+                future = pool.submit(_parse, fn, page)
+            except (BrokenProcessPool, RuntimeError):
+                self._discard_pool(pool)
+            else:
+                with self._lock:
+                    self.offloaded += 1
+                return future
+
+        done: Future[T] = Future()
+        try:
+            done.set_result(self._run_inline(fn, page))
+        except Exception as e:
+            done.set_exception(e)
+        return done
+
+    def _result(self, future: "Future[T]", fn: Callable[[str], T], page: Page) -> T:
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            if self._pool is not None:
+                self._discard_pool(self._pool)
+            return self._run_inline(fn, page)
+
+    def run(self, fn: Callable[[str], T], page: Page) -> T:
+        """解析一页并返回结果"""
+        if not self.should_offload(page):
+            return self._run_inline(fn, page)
+        return self._result(self.submit(fn, page), fn, page)
+
+    def map(self, fn: Callable[[str], T], pages: Iterable[Page]) -> List[T]:
+        """解析多页, 按顺序返回结果; 大页面先送出, 小页面在等待期间就地解析"""
+        pages = list(pages)
+        futures: List[Optional[Future[T]]] = [
+            self.submit(fn, page) if self.should_offload(page) else None
+            for page in pages
+        ]
+        return [
+            (
+                self._run_inline(fn, page)
+                if future is None
+                else self._result(future, fn, page)
+            )
+            for future, page in zip(futures, pages)
+        ]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def __repr__(self) -> str:
+        return (
+            f"ParseExecutor(processes={self.processes}, min_size={self.min_size}, "
+            f"offloaded={self.offloaded}, inline={self.inline})"
+        )
+
+
+parse_executor = ParseExecutor.from_resource(Resource())
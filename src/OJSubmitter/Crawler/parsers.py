@@ -0,0 +1,340 @@
+import html
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, cast
+
+from bs4 import BeautifulSoup, ResultSet, Tag
+from bs4.filter import SoupStrainer
+
+from ..Constant.stage import DEFAULT_OJ_UTC_OFFSET
+from ..Constant.status import RunningStatus, Verdict
+from ..Constant.verdict import FINAL_VERDICTS
+from ..Typehint.problem import (
+    OneProblemContent,
+    OneProblemContentLiteral,
+    StageRow,
+    StageSnapshot,
+    VerdictRow,
+)
+from .extractors import ProblemPageExtractor, TableCellsExtractor
+
+STAGE_NOT_FOUND_TIP = "没有这样的关卡!"
+# 题目列表的开始; 运行状态与各种提示都在它之前
+STAGE_TABLE_MARKERS = ['id="problemset"', "id='problemset'", "id=problemset"]
+
+_TIME = r"(\d{4}-\d{1,2}-\d{1,2}\s+\d{1,2}:\d{2}(?::\d{2})?)"
+START_TIME_RE = re.compile(r"(?:开始时间|Start\s*Time)\s*[:：]?\s*" + _TIME, re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+_CENTER_OPEN_RE = re.compile(r"<center\b[^>]*>", re.I)
+_RESULT_ROW_RE = re.compile(
+    r"<tr\b[^>]*\sclass=[\"']?(?:[^\"'>]*\s)?(?:evenrow|oddrow)(?=[\s\"'>])", re.I
+)
+RESULT_ROW_CLASSES = frozenset({"evenrow", "oddrow"})
+# "等待"是"等待重判"的前缀, 先匹配较长者
+_VERDICTS_LONGEST_FIRST = sorted(Verdict, key=len, reverse=True)
+END_TIME_RE = re.compile(r"(?:结束时间|End\s*Time)\s*[:：]?\s*" + _TIME, re.I)
+
+SECTION_TITLES = {
+    "题目描述": "description",
+    "输入": "input",
+    "输出": "output",
+    "样例输入": "sample_input",
+    "样例输出": "sample_output",
+    "带填充标签的C/C++原程序": "code_with_filling",
+}
+
+
+def parse_problem_content(page_text: str) -> OneProblemContent:
+    return ProblemPageExtractor(SECTION_TITLES).extract(page_text)
+
+
+def parse_problem_content_soup(page_text: str) -> OneProblemContent:
+    """基于完整BeautifulSoup树的参考实现, 用于校验`parse_problem_content`"""
+    soup = BeautifulSoup(page_text, "html.parser")
+    returns: OneProblemContent = OneProblemContent(
+        description="",
+        input="",
+        output="",
+        sample_input="",
+        sample_output="",
+        code_with_filling="",
+    )
+
+    def get_section_by_h2(title: str) -> str:
+        h2: Optional[Tag] = soup.find("h2", string=cast(Any, title))
+        if not h2:
+            return ""
+        content_div = h2.find_next_sibling("div", class_="content")
+        if not content_div:
+            return ""
+        sample_span = content_div.find("span", class_="sampledata")
+        if sample_span:
+            return sample_span.get_text(strip=True)
+        pre = content_div.find("pre")
+        if pre:
+            return pre.get_text()
+        return content_div.get_text(strip=True)
+
+    for cn, en in SECTION_TITLES.items():
+        returns[cast(OneProblemContentLiteral, en)] = get_section_by_h2(cn)
+
+    return returns
+
+
+def _element_end(page: str, tag: str, start: int) -> int:
+    """从`start`处的开始标签起扫描到与之配对的结束标签之后, 未闭合时到页尾"""
+    depth = 0
+    for m in re.finditer(rf"<(/?){tag}\b[^>]*>", page[start:], re.I):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            return start + m.end()
+    return len(page)
+
+
+def _element_by_id(page: str, element_id: str) -> Optional[str]:
+    """不构建DOM, 截取id为`element_id`的元素的HTML"""
+    opening = re.search(
+        rf"<([a-z][\w-]*)\b[^>]*\sid=[\"']?{re.escape(element_id)}(?=[\s\"'/>])",
+        page,
+        re.I,
+    )
+    if opening is None:
+        return None
+    return page[opening.start() : _element_end(page, opening.group(1), opening.start())]
+
+
+def parse_running_id(status_page: str) -> Optional[int]:
+    """只解析#result-tab中的第一行; 扫描不到表格时退回完整解析"""
+    if "result-tab" not in status_page:
+        return None
+    table = _element_by_id(status_page, "result-tab")
+    if table is None:
+        return _running_id(BeautifulSoup(status_page, "html.parser"))
+    first = _RESULT_ROW_RE.search(table)
+    if first is None:
+        return None
+    row = table[first.start() : _element_end(table, "tr", first.start())]
+    tds = BeautifulSoup(row, "html.parser", parse_only=SoupStrainer("td"))
+    return _to_running_id(tds.find_all("td"))
+
+
+def _running_id(soup: BeautifulSoup) -> Optional[int]:
+    result_table = soup.find("table", id="result-tab")
+    if not result_table:
+        return None
+    instances = result_table.find_all("tr", class_=re.compile("^(evenrow|oddrow)$"))
+    if not instances:
+        return None
+    return _to_running_id(instances[0].find_all("td"))
+
+
+def _to_running_id(tds: ResultSet[Tag]) -> Optional[int]:
+    if len(tds) < 1:
+        return None
+    running_id_str: str = tds[0].get_text(strip=True)
+    if not running_id_str.isdigit():
+        return None
+    return int(running_id_str)
+
+
+def parse_status_rows(status_page: str) -> List[VerdictRow]:
+    """#result-tab中的全部提交行(新的在前); 扫描不到表格时退回完整解析"""
+    if "result-tab" not in status_page:
+        return []
+    table = _element_by_id(status_page, "result-tab")
+    if table is None:
+        return _status_rows(BeautifulSoup(status_page, "html.parser"))
+    extractor = TableCellsExtractor(None, "result-tab", RESULT_ROW_CLASSES)
+    return _to_verdict_rows(extractor.extract(table))
+
+
+def _status_rows(soup: BeautifulSoup) -> List[VerdictRow]:
+    result_table = soup.find("table", id="result-tab")
+    if not result_table:
+        return []
+    instances = result_table.find_all("tr", class_=re.compile("^(evenrow|oddrow)$"))
+    return _to_verdict_rows(
+        [[td.get_text(strip=True) for td in row.find_all("td")] for row in instances]
+    )
+
+
+def parse_verdict(result: str) -> Optional[Verdict]:
+    """结果单元格文字对应的评测结果, 允许其后附加得分等文字"""
+    for verdict in _VERDICTS_LONGEST_FIRST:
+        if result.startswith(verdict):
+            return verdict
+    return None
+
+
+def _to_verdict_rows(status_rows: List[List[str]]) -> List[VerdictRow]:
+    """列的位置因OJ版本而异, 以第一个能识别为评测结果的单元格为结果列"""
+    rows: List[VerdictRow] = []
+    for tds in status_rows:
+        if not tds or not tds[0].isdigit():
+            continue
+        verdict: Optional[Verdict] = None
+        result = ""
+        for cell in tds[1:]:
+            verdict = parse_verdict(cell)
+            if verdict is not None:
+                result = cell
+                break
+        rows.append(
+            VerdictRow(
+                running_id=int(tds[0]),
+                verdict=verdict,
+                result=result,
+                final=verdict in FINAL_VERDICTS,
+                cells=tds,
+            )
+        )
+    return rows
+
+
+def parse_stage_rows(stage_page: str) -> List[StageRow]:
+    """只扫描#problemset的tbody中的单元格文字; 扫描不到表格时退回完整解析"""
+    if "problemset" not in stage_page:
+        return []
+    table = _element_by_id(stage_page, "problemset")
+    if table is None:
+        return _stage_rows(BeautifulSoup(stage_page, "html.parser"))
+    return _to_stage_rows(TableCellsExtractor("tbody").extract(table))
+
+
+def _stage_rows(soup: BeautifulSoup) -> List[StageRow]:
+    problem_rows: List[Tag] = soup.select("#problemset tbody tr")
+    return _to_stage_rows(
+        [[td.get_text(strip=True) for td in row.find_all("td")] for row in problem_rows]
+    )
+
+
+def _to_stage_rows(problem_rows: List[List[str]], start: int = 0) -> List[StageRow]:
+    rows: List[StageRow] = []
+    for index, tds in enumerate(problem_rows, start):
+        if len(tds) < 3:  # 缺少标题列的行(如提示行)不是题目
+            continue
+
+        rows.append(
+            StageRow(
+                pid=index,
+                topic=tds[2],
+                finished=tds[0] == "Y",
+            )
+        )
+    return rows
+
+
+def iter_stage_rows(chunks: Iterable[str]) -> Iterator[StageRow]:
+    """从分块到达的关卡页中逐行产出题目, 每个tr结束即产出, 不必等待整页"""
+    extractor = TableCellsExtractor("tbody", scope_id="problemset")
+    index = 0
+    for chunk in chunks:
+        extractor.feed(chunk)
+        completed = extractor.pop_completed()
+        yield from _to_stage_rows(completed, index)
+        index += len(completed)
+    extractor.close()
+    yield from _to_stage_rows(extractor.pop_completed(), index)
+
+
+def parse_running_status(stage_page: str, status_code: int = 200) -> RunningStatus:
+    """逐个解析#main中的center, 读到状态即停止; 扫描不到#main时退回完整解析"""
+    if RunningStatus.NO_ACCESS in stage_page:
+        return RunningStatus.NO_ACCESS
+    if status_code != 200:
+        return RunningStatus.NOT_STARTED
+
+    main = _element_by_id(stage_page, "main")
+    if main is None:
+        return _running_status(BeautifulSoup(stage_page, "html.parser"))
+    for opening in _CENTER_OPEN_RE.finditer(main):
+        center = main[opening.start() : _element_end(main, "center", opening.start())]
+        spans = BeautifulSoup(center, "html.parser", parse_only=SoupStrainer("span"))
+        status = _span_status(spans.find_all("span"))
+        if status is not None:
+            return status
+    return RunningStatus.NOT_STARTED
+
+
+def _running_status(soup: BeautifulSoup) -> RunningStatus:
+    center_divs: ResultSet[Tag] = soup.select("#main center")
+    for center in center_divs:
+        status = _span_status(center.find_all("span"))
+        if status is not None:
+            return status
+    return RunningStatus.NOT_STARTED
+
+
+def _span_status(status_spans: ResultSet[Tag]) -> Optional[RunningStatus]:
+    for span in status_spans:
+        span_text = span.get_text(strip=True)
+        if RunningStatus.RUNNING in span_text:
+            return RunningStatus.RUNNING
+        elif RunningStatus.ENDED in span_text:
+            return RunningStatus.ENDED
+    return None
+
+
+def _to_timestamp(text: str, utc_offset: float) -> Optional[float]:
+    text = " ".join(text.split())
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            dt = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return dt.replace(tzinfo=timezone(timedelta(hours=utc_offset))).timestamp()
+    return None
+
+
+def parse_stage_schedule(
+    stage_page: str, utc_offset: float = DEFAULT_OJ_UTC_OFFSET
+) -> Tuple[Optional[float], Optional[float]]:
+    """关卡页中的开始/结束时间(时间戳), 未找到时为None"""
+    start = START_TIME_RE.search(stage_page)
+    end = END_TIME_RE.search(stage_page)
+    return (
+        _to_timestamp(start.group(1), utc_offset) if start else None,
+        _to_timestamp(end.group(1), utc_offset) if end else None,
+    )
+
+
+def is_stage_existing(stage_page: str) -> bool:
+    return STAGE_NOT_FOUND_TIP not in stage_page
+
+
+def parse_stage_snapshot(
+    cid: int,
+    stage_page: str,
+    status_code: int,
+    utc_offset: float = DEFAULT_OJ_UTC_OFFSET,
+    rows: Optional[List[StageRow]] = None,
+) -> StageSnapshot:
+    """一次解析关卡页的全部信息(存在性, 权限, 运行状态, 题目列表)
+
+    已逐行读出题目列表时由`rows`传入, 不再重复解析.
+    """
+    status = RunningStatus.NOT_STARTED
+    stage_rows: List[StageRow] = []
+    start_at: Optional[float] = None
+    end_at: Optional[float] = None
+    if RunningStatus.NO_ACCESS in stage_page:
+        status = RunningStatus.NO_ACCESS
+    if status_code == 200:
+        if status is not RunningStatus.NO_ACCESS:
+            status = parse_running_status(stage_page, status_code)
+        stage_rows = parse_stage_rows(stage_page) if rows is None else rows
+        text = html.unescape(_TAG_RE.sub(" ", stage_page))
+        start_at, end_at = parse_stage_schedule(text, utc_offset)
+
+    return StageSnapshot(
+        cid=cid,
+        existing=is_stage_existing(stage_page),
+        accessible=status is not RunningStatus.NO_ACCESS,
+        status=status,
+        status_code=status_code,
+        rows=stage_rows,
+        start_at=start_at,
+        end_at=end_at,
+        fetched_at=time.time(),
+    )
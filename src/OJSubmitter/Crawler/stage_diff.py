@@ -0,0 +1,42 @@
+from typing import Dict, Optional, Tuple
+
+from ..Typehint.problem import StageDiff, StageRow, StageSnapshot
+
+RowKey = Tuple[int, str]
+
+
+def row_key(row: StageRow) -> RowKey:
+    return row["pid"], row["topic"]
+
+
+def diff_snapshots(old: Optional[StageSnapshot], new: StageSnapshot) -> StageDiff:
+    """比较两次关卡快照, `old`为None时全部行视为新增"""
+    old_rows: Dict[RowKey, StageRow] = (
+        {} if old is None else {row_key(r): r for r in old["rows"]}
+    )
+    new_rows: Dict[RowKey, StageRow] = {row_key(r): r for r in new["rows"]}
+
+    return StageDiff(
+        cid=new["cid"],
+        previous_status=None if old is None else old["status"],
+        status=new["status"],
+        existing=new["existing"],
+        existing_changed=old is None or old["existing"] != new["existing"],
+        added=[r for k, r in new_rows.items() if k not in old_rows],
+        removed=[r for k, r in old_rows.items() if k not in new_rows],
+        finished_changed=[
+            r
+            for k, r in new_rows.items()
+            if k in old_rows and old_rows[k]["finished"] != r["finished"]
+        ],
+    )
+
+
+def is_empty(diff: StageDiff) -> bool:
+    return (
+        diff["previous_status"] == diff["status"]
+        and not diff["existing_changed"]
+        and not diff["added"]
+        and not diff["removed"]
+        and not diff["finished_changed"]
+    )
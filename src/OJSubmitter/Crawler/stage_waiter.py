@@ -0,0 +1,54 @@
+from typing import Callable, Optional, Tuple
+
+from ..Constant.stage import (
+    WAIT_BURST_INTERVAL,
+    WAIT_BURST_LEAD,
+    WAIT_BURST_WINDOW,
+    WAIT_COARSE_MAX,
+)
+from ..Constant.status import RunningStatus
+from ..Transport.deadline import Deadline
+from ..Typehint.problem import StageSnapshot, WaitReport
+
+Refresher = Callable[[Optional[Deadline]], StageSnapshot]
+
+# 到达这些状态后不会再变为运行中, 停止等待; 关卡不存在时同样停止
+FINAL_STATUSES = frozenset(
+    {RunningStatus.RUNNING, RunningStatus.ENDED, RunningStatus.NO_ACCESS}
+)
+
+
+def next_pause(
+    snapshot: StageSnapshot, interval: float, now: float
+) -> Tuple[float, bool]:
+    """下一次轮询前的等待时间, 以及是否处于开始时间附近的密集轮询
+
+    页面给出开始时间时, 远离开始时间则一直睡到开始前`WAIT_BURST_LEAD`秒
+    (单次最多`WAIT_COARSE_MAX`秒), 开始前后一小段时间内以`WAIT_BURST_INTERVAL`
+    密集轮询; 未给出开始时间或已过密集窗口时按`interval`轮询.
+    """
+    start_at = snapshot["start_at"]
+    if start_at is None:
+        return interval, False
+    until = start_at - now
+    if until > WAIT_BURST_LEAD:
+        return min(until - WAIT_BURST_LEAD, WAIT_COARSE_MAX), False
+    if until > -WAIT_BURST_WINDOW:
+        return WAIT_BURST_INTERVAL, True
+    return interval, False
+
+
+def describe_wait_report(report: WaitReport) -> str:
+    text = (
+        f"关卡{report['cid']}等待结束({report['status']}): 用时{report['waited']:.2f}秒, "
+        f"请求{report['requests']}次(密集轮询{report['burst_requests']}次)"
+    )
+    if report["errors"]:
+        text += f", 失败{report['errors']}次"
+    if report["error"]:
+        text += f", 因连续失败放弃: {report['error']}"
+    if not report["existing"]:
+        text += ", 关卡不存在"
+    if report["reaction_latency"] is not None:
+        text += f", 距开始时间{report['reaction_latency']:.2f}秒后检测到"
+    return text
@@ -0,0 +1,326 @@
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, Collection, Dict, Optional, Tuple, TypedDict
+
+import requests
+
+from ...Typehint.basic import NonCallback
+from ..Constant.stage import (
+    WATCH_DEFAULT_INTERVAL,
+    WATCH_LOG_SOURCE,
+    WATCH_MAX_FAILURES,
+)
+from ..Constant.status import RunningStatus
+from ..Interface.log_interface import BaseLogger, NonLogger
+from ..Transport.clock import server_clock
+from ..Transport.deadline import Deadline
+from ..Typehint.problem import StageDiff, StageSnapshot, WaitReport
+from .stage_diff import diff_snapshots, is_empty
+from .stage_waiter import FINAL_STATUSES, Refresher, next_pause
+
+# 快照含账号相关的状态(无权进入, 完成情况), 不同账号不能共享
+WatchKey = Tuple[int, str, str]  # (cid, host, 账号)
+Subscriber = Callable[[StageDiff], None]
+Prober = Callable[[Optional[Deadline]], RunningStatus]
+ErrorHandler = Callable[[str, int], None]  # (错误, 连续失败次数)
+
+
+class _Subscription(TypedDict):
+    fn: Subscriber
+    interval: float
+    refresh: Refresher
+    probe: Optional[Prober]
+    on_error: Optional[ErrorHandler]
+
+
+class _Watch:
+    """一个(cid, 节点, 账号)的轮询计划, 由最近加入且仍在的订阅者的`refresh`驱动
+
+    提供`probe`时, 未开始阶段只做轻量的状态检查, 状态变化时才完整刷新.
+    """
+
+    def __init__(self, key: WatchKey, owner: "StageWatcher") -> None:
+        self.key = key
+        self.owner = owner
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.subscribers: Dict[int, _Subscription] = {}
+        self.snapshot: Optional[StageSnapshot] = None
+        self.requests = 0
+        self.burst_requests = 0
+        self.probes = 0
+        self.errors = 0
+        self.failures = 0  # 连续失败次数
+        self.last_error = ""
+        self.thread = self._new_thread()
+
+    def _new_thread(self) -> threading.Thread:
+        return threading.Thread(
+            target=self.run, name=f"oj-watch-{self.key[0]}", daemon=True
+        )
+
+    def ensure_running(self) -> None:
+        """启动轮询线程; 线程意外退出过时换新线程重启"""
+        if self.thread.is_alive():
+            return
+        if self.thread.ident is not None:
+            self.thread = self._new_thread()
+        self.thread.start()
+
+    @property
+    def interval(self) -> float:
+        with self.lock:
+            return min(
+                (s["interval"] for s in self.subscribers.values()),
+                default=WATCH_DEFAULT_INTERVAL,
+            )
+
+    def _source(self) -> Tuple[Optional[Refresher], Optional[Prober]]:
+        """最近加入的订阅者的请求函数, 调用方需持有锁; 订阅者离开后不再使用其函数"""
+        for sub in reversed(self.subscribers.values()):
+            return sub["refresh"], sub["probe"]
+        return None, None
+
+    def _call(self, fn: Callable[..., None], *args: object) -> None:
+        """单个订阅者的异常不影响其他订阅者与轮询"""
+        try:
+            fn(*args)
+        except Exception as e:
+            self.owner.logger.error(
+                f"关卡{self.key[0]}的订阅者处理失败: {type(e).__name__}: {e}",
+                WATCH_LOG_SOURCE,
+            )
+
+    def _on_error(self, e: Exception) -> None:
+        error = f"{type(e).__name__}: {e}"
+        with self.lock:
+            self.errors += 1
+            self.failures += 1
+            self.last_error = error
+            failures = self.failures
+            handlers = [
+                s["on_error"] for s in self.subscribers.values() if s["on_error"]
+            ]
+        logger = self.owner.logger
+        if not isinstance(e, requests.RequestException):
+            logger.error(f"关卡{self.key[0]}轮询失败: {error}", WATCH_LOG_SOURCE)
+        elif failures in (1, WATCH_MAX_FAILURES):
+            # 请求失败可能持续很久, 只在开始失败与达到上限时记录
+            logger.warn(
+                f"关卡{self.key[0]}轮询请求失败(连续{failures}次): {error}",
+                WATCH_LOG_SOURCE,
+            )
+        for handler in handlers:
+            self._call(handler, error, failures)
+
+    def run(self) -> None:
+        bursting = False
+        while not self.stopped.is_set():
+            interval = self.interval
+            try:
+                snapshot = self._poll(bursting)
+            except Exception as e:
+                # 轮询线程由所有订阅者共享, 任何异常都不能使其退出
+                self._on_error(e)
+                self.stopped.wait(interval)
+                continue
+            if snapshot is None:
+                return  # 最后一个订阅者已离开
+
+            with self.lock:
+                self.failures = 0
+                diff = diff_snapshots(self.snapshot, snapshot)
+                self.snapshot = snapshot
+                subscribers = [s["fn"] for s in self.subscribers.values()]
+            if not is_empty(diff):
+                for fn in subscribers:
+                    self._call(fn, diff)
+
+            if snapshot["status"] in FINAL_STATUSES:
+                pause, bursting = interval, False
+            else:
+                pause, bursting = next_pause(
+                    snapshot, interval, server_clock.server_now()
+                )
+            self.stopped.wait(pause)
+
+    def _poll(self, bursting: bool) -> Optional[StageSnapshot]:
+        """没有订阅者时返回None"""
+        with self.lock:
+            refresh, probe = self._source()
+            if refresh is None:
+                return None
+            snapshot = self.snapshot
+            self.requests += 1
+            self.burst_requests += bursting
+        if (
+            probe is not None
+            and snapshot is not None
+            and snapshot["status"] not in FINAL_STATUSES
+        ):
+            status = probe(None)
+            with self.lock:
+                self.probes += 1
+            if status == snapshot["status"]:
+                return snapshot
+            with self.lock:
+                self.requests += 1
+        return refresh(None)
+
+
+class StageWatcher:
+    """关卡状态的共享轮询服务
+
+    每个(cid, 节点, 账号)只有一个轮询线程, 状态变化以StageDiff分发给所有订阅者
+    (回调在轮询线程中调用), 轮询开销只与被关注的关卡数有关. 最后一个订阅者
+    取消后轮询停止.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._watches: Dict[WatchKey, _Watch] = {}
+        self._next_id = 0
+        self.logger: BaseLogger = NonLogger()  # 由GUI/CLI启动时设置
+
+    def subscribe(
+        self,
+        key: WatchKey,
+        refresh: Refresher,
+        fn: Subscriber,
+        interval: float = WATCH_DEFAULT_INTERVAL,
+        probe: Optional[Prober] = None,
+        on_error: Optional[ErrorHandler] = None,
+    ) -> NonCallback:
+        """订阅`key`的关卡变化, 已有快照时立即以完整差异调用一次`fn`
+
+        Args:
+            key (WatchKey): (cid, 节点, 账号)
+            refresh (Refresher): 用于轮询的函数, 轮询使用最近加入且仍在的订阅者的函数
+            fn (Subscriber): 接收差异的回调
+            interval (float, optional): 期望的轮询间隔, 同一计划取所有订阅者中最小者. sec
+            probe (Optional[Prober], optional): 与`refresh`一同使用的轻量状态检查函数. Defaults to None.
+            on_error (Optional[ErrorHandler], optional): 每次轮询失败时以错误与连续失败次数调用. Defaults to None.
+
+        Returns:
+            NonCallback: 取消订阅的函数
+        """
+        with self._lock:
+            watch = self._watches.get(key)
+            if watch is None:
+                watch = self._watches[key] = _Watch(key, self)
+            sid = self._next_id
+            self._next_id += 1
+            with watch.lock:
+                watch.subscribers[sid] = _Subscription(
+                    fn=fn,
+                    interval=interval,
+                    refresh=refresh,
+                    probe=probe,
+                    on_error=on_error,
+                )
+                snapshot = watch.snapshot
+            watch.ensure_running()
+
+        if snapshot is not None:
+            watch._call(fn, diff_snapshots(None, snapshot))
+
+        def unsubscribe() -> None:
+            with self._lock:
+                with watch.lock:
+                    watch.subscribers.pop(sid, None)
+                    idle = not watch.subscribers
+                if idle and self._watches.get(key) is watch:
+                    del self._watches[key]
+                    watch.stopped.set()
+
+        return unsubscribe
+
+    def until(
+        self,
+        key: WatchKey,
+        refresh: Refresher,
+        statuses: Collection[RunningStatus] = FINAL_STATUSES,
+        interval: float = WATCH_DEFAULT_INTERVAL,
+        probe: Optional[Prober] = None,
+    ) -> "Future[WaitReport]":
+        """关卡进入`statuses`之一, 确认不存在, 或轮询连续失败`WATCH_MAX_FAILURES`次时
+        完成的Future(后者报告中`error`非空), 取消Future即取消订阅
+        """
+        future: Future[WaitReport] = Future()
+        began = time.monotonic()
+        req0, burst0, errors0 = self._counts(key)
+
+        def finish(status: RunningStatus, existing: bool, error: str = "") -> None:
+            if future.done():
+                return
+            requests_now, burst_now, errors_now = self._counts(key)
+            snapshot = self.snapshot(key)
+            start_at = snapshot["start_at"] if snapshot else None
+            detected_at = server_clock.server_now()
+            report = WaitReport(
+                cid=key[0],
+                status=status,
+                existing=existing,
+                start_at=start_at,
+                detected_at=detected_at,
+                reaction_latency=(
+                    detected_at - start_at
+                    if start_at is not None and status == RunningStatus.RUNNING
+                    else None
+                ),
+                requests=requests_now - req0,
+                burst_requests=burst_now - burst0,
+                waited=time.monotonic() - began,
+                errors=errors_now - errors0,
+                error=error,
+                # Future完成时即取消订阅, 此后共享快照可能已随轮询计划移除
+                snapshot=snapshot,
+            )
+            # 订阅时的立即回调与轮询线程可能同时到达
+            if not future.done():
+                try:
+                    future.set_result(report)
+                except InvalidStateError:
+                    pass
+
+        def on_diff(diff: StageDiff) -> None:
+            if diff["status"] in statuses or not diff["existing"]:
+                finish(diff["status"], diff["existing"])
+
+        def on_error(error: str, failures: int) -> None:
+            if failures < WATCH_MAX_FAILURES:
+                return
+            snapshot = self.snapshot(key)
+            if snapshot is None:
+                finish(RunningStatus.NOT_STARTED, True, error)
+            else:
+                finish(snapshot["status"], snapshot["existing"], error)
+
+        # 订阅时可能已满足条件而立即完成, 取消订阅放在done回调中统一处理
+        unsubscribe = self.subscribe(key, refresh, on_diff, interval, probe, on_error)
+        future.add_done_callback(lambda _: unsubscribe())
+        return future
+
+    def _counts(self, key: WatchKey) -> Tuple[int, int, int]:
+        """(请求数, 密集轮询请求数, 失败次数)"""
+        with self._lock:
+            watch = self._watches.get(key)
+        if watch is None:
+            return 0, 0, 0
+        with watch.lock:
+            return watch.requests, watch.burst_requests, watch.errors
+
+    def snapshot(self, key: WatchKey) -> Optional[StageSnapshot]:
+        with self._lock:
+            watch = self._watches.get(key)
+        if watch is None:
+            return None
+        with watch.lock:
+            return watch.snapshot
+
+    def __repr__(self) -> str:
+        return f"StageWatcher(watching={len(self._watches)})"
+
+
+stage_watcher = StageWatcher()
@@ -0,0 +1,233 @@
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from ..Constant.verdict import (
+    VERDICT_BATCH_FULL,
+    VERDICT_LOG_SOURCE,
+    VERDICT_MAX_INTERVAL,
+    VERDICT_MAX_PAGES,
+    VERDICT_MIN_INTERVAL,
+    VERDICT_TIMEOUT,
+)
+from ..Interface.log_interface import BaseLogger, NonLogger
+from ..Typehint.problem import VerdictRow
+
+TrackKey = Tuple[str, int]  # (账号, cid)
+VerdictCallback = Callable[[VerdictRow], None]
+# 请求一页状态页; 参数为本页最大运行号(top), None表示最新一页
+StatusFetcher = Callable[[Optional[int]], List[VerdictRow]]
+
+
+def poll_interval(pending: int) -> float:
+    """待定数不少于`VERDICT_BATCH_FULL`时按最短间隔轮询, 越少间隔越长"""
+    if pending <= 0:
+        return VERDICT_MAX_INTERVAL
+    return min(
+        VERDICT_MAX_INTERVAL,
+        VERDICT_MIN_INTERVAL * VERDICT_BATCH_FULL / min(pending, VERDICT_BATCH_FULL),
+    )
+
+
+class _Tracking:
+    """一个(账号, cid)的待定运行号, 由一个轮询线程批量查询"""
+
+    def __init__(
+        self,
+        key: TrackKey,
+        fetch: StatusFetcher,
+        owner: "VerdictTracker",
+    ) -> None:
+        self.key = key
+        self.fetch = fetch
+        self.owner = owner
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.pending: Dict[int, Tuple["Future[VerdictRow]", float]] = {}
+        self.requests = 0
+        self.resolved = 0
+        self.errors = 0
+        self.failures = 0  # 连续失败次数
+        self.thread = self._new_thread()
+
+    def _new_thread(self) -> threading.Thread:
+        return threading.Thread(
+            target=self.run, name=f"oj-verdict-{self.key[0]}-{self.key[1]}", daemon=True
+        )
+
+    def ensure_running(self) -> None:
+        """启动轮询线程; 线程意外退出过时换新线程重启"""
+        if self.thread.is_alive():
+            return
+        if self.thread.ident is not None:
+            self.thread = self._new_thread()
+        self.thread.start()
+
+    def add(self, running_id: int) -> "Future[VerdictRow]":
+        with self.lock:
+            entry = self.pending.get(running_id)
+            if entry is None:
+                entry = self.pending[running_id] = (Future(), time.monotonic())
+            return entry[0]
+
+    def _live(self) -> Dict[int, "Future[VerdictRow]"]:
+        """清理已取消或超时的运行号, 返回仍需查询的"""
+        now = time.monotonic()
+        live: Dict[int, Future[VerdictRow]] = {}
+        expired: List[Tuple[int, Future[VerdictRow]]] = []
+        with self.lock:
+            for running_id, (future, since) in list(self.pending.items()):
+                if future.done():
+                    del self.pending[running_id]
+                elif now - since > VERDICT_TIMEOUT:
+                    del self.pending[running_id]
+                    expired.append((running_id, future))
+                else:
+                    live[running_id] = future
+        for running_id, future in expired:
+            try:
+                future.set_exception(
+                    TimeoutError(
+                        f"运行号{running_id}在{VERDICT_TIMEOUT:.0f}秒内未出结果"
+                    )
+                )
+            except InvalidStateError:
+                pass  # 已被调用方取消
+        return live
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            live = self._live()
+            # 没有待定运行号时注销自己
+            if not live and self.owner._release(self):
+                return
+            self.stopped.wait(poll_interval(len(live)))
+            try:
+                self._poll()
+            except Exception as e:
+                # 轮询线程由同账号同关卡的所有提交共享, 任何异常都不能使其退出
+                with self.lock:
+                    self.errors += 1
+                    self.failures += 1
+                    failures = self.failures
+                error = f"关卡{self.key[1]}的评测结果查询失败: {type(e).__name__}: {e}"
+                if not isinstance(e, requests.RequestException):
+                    self.owner.logger.error(error, VERDICT_LOG_SOURCE)
+                elif failures == 1:
+                    # 请求失败可能持续, 只在开始失败时记录; 超时后Future以TimeoutError结束
+                    self.owner.logger.warn(error, VERDICT_LOG_SOURCE)
+            else:
+                with self.lock:
+                    self.failures = 0
+
+    def _poll(self) -> None:
+        """一轮查询: 从最大的待定运行号所在页开始, 较早的运行号不在页内时继续翻页"""
+        wanted = set(self._live())
+        top: Optional[int] = max(wanted, default=None)
+        for _ in range(VERDICT_MAX_PAGES):
+            if top is None:
+                break
+            rows = self.fetch(top)
+            with self.lock:
+                self.requests += 1
+            self._resolve(rows)
+            wanted -= {row["running_id"] for row in rows}
+            if not rows:
+                break
+            oldest = min(row["running_id"] for row in rows)
+            top = max((r for r in wanted if r < oldest), default=None)
+
+    def _resolve(self, rows: List[VerdictRow]) -> None:
+        finished: List[Tuple[Future[VerdictRow], VerdictRow]] = []
+        with self.lock:
+            for row in rows:
+                if not row["final"] or row["running_id"] not in self.pending:
+                    continue
+                future, _ = self.pending.pop(row["running_id"])
+                finished.append((future, row))
+                self.resolved += 1
+        for future, row in finished:
+            try:
+                future.set_result(row)
+            except InvalidStateError:
+                pass  # 已被调用方取消
+
+
+class VerdictTracker:
+    """批量跟踪已提交运行号的评测结果
+
+    每个(账号, cid)只有一个轮询线程, 每轮只请求一次状态页(较早的运行号不在
+    首页时才翻页), 解析其中所有行, 为已有最终结果的运行号完成Future. 待定数越少
+    轮询间隔越长, 没有待定运行号时线程退出.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._trackings: Dict[TrackKey, _Tracking] = {}
+        self.logger: BaseLogger = NonLogger()  # 由GUI/CLI启动时设置
+
+    def track(
+        self,
+        key: TrackKey,
+        running_id: int,
+        fetch: StatusFetcher,
+        callback: Optional[VerdictCallback] = None,
+    ) -> "Future[VerdictRow]":
+        """登记运行号, 评测结果不再变化时完成返回的Future
+
+        Args:
+            key (TrackKey): (账号, cid)
+            running_id (int): 运行号
+            fetch (StatusFetcher): 尚无轮询线程时用于请求状态页的函数
+            callback (Optional[VerdictCallback], optional): 得到最终结果时在轮询线程中调用. Defaults to None.
+
+        Returns:
+            Future[VerdictRow]: 超过`VERDICT_TIMEOUT`仍无结果时以TimeoutError结束; 取消即停止跟踪
+        """
+        with self._lock:
+            tracking = self._trackings.get(key)
+            if tracking is None:
+                tracking = self._trackings[key] = _Tracking(key, fetch, self)
+            future = tracking.add(running_id)
+            tracking.ensure_running()
+
+        if callback is not None:
+
+            def on_done(done: "Future[VerdictRow]") -> None:
+                if not done.cancelled() and done.exception() is None:
+                    callback(done.result())
+
+            future.add_done_callback(on_done)
+        return future
+
+    def _release(self, tracking: _Tracking) -> bool:
+        with self._lock:
+            with tracking.lock:
+                if tracking.pending:
+                    return False
+            if self._trackings.get(tracking.key) is tracking:
+                del self._trackings[tracking.key]
+            tracking.stopped.set()
+            return True
+
+    def pending(self, key: TrackKey) -> List[int]:
+        with self._lock:
+            tracking = self._trackings.get(key)
+        if tracking is None:
+            return []
+        with tracking.lock:
+            return sorted(tracking.pending)
+
+    @property
+    def tracking(self) -> List[TrackKey]:
+        with self._lock:
+            return list(self._trackings)
+
+    def __repr__(self) -> str:
+        return f"VerdictTracker(tracking={len(self._trackings)})"
+
+
+verdict_tracker = VerdictTracker()
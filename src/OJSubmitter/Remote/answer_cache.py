@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple, TypedDict
+
+from ..Constant.answer import (
+    CFG_ANSWER_CACHE_ENABLED,
+    CFG_ANSWER_CACHE_MAX_BYTES,
+    CFG_ANSWER_CACHE_MAX_ENTRIES,
+    CFG_ANSWER_CACHE_TTL,
+    DEFAULT_ANSWER_CACHE_ENABLED,
+    DEFAULT_ANSWER_CACHE_MAX_BYTES,
+    DEFAULT_ANSWER_CACHE_MAX_ENTRIES,
+    DEFAULT_ANSWER_CACHE_TTL,
+)
+from ..Constant.request_consts import Language
+from ..Constant.resource import ANSWER_CACHE_PATH
+from ..Resource import Resource
+from ..Typehint.problem import OneProblemContent, OneProblemContentLiteral
+
+# 参与缓存键的字段, 顺序固定
+CONTENT_FIELDS: Tuple[OneProblemContentLiteral, ...] = (
+    "description",
+    "input",
+    "output",
+    "sample_input",
+    "sample_output",
+    "code_with_filling",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    language TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class AnswerCacheStats(TypedDict):
+    hits: int
+    misses: int
+    expired: int  # 因超过TTL被删除的条目数
+    evicted: int  # 因超出容量被淘汰的条目数
+    entries: int
+    bytes: int  # 答案文字的总字节数
+
+
+def normalize_text(text: str) -> str:
+    """统一换行并去掉行尾与首尾空白"""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def content_key(content: OneProblemContent, language: Language) -> str:
+    """题目内容(规范化后)与语言的哈希"""
+    payload = [language.name] + [
+        normalize_text(content[field]) for field in CONTENT_FIELDS
+    ]
+    return hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+class AnswerCache:
+    """SavedData中的持久答案缓存
+
+    以规范化题目内容与语言的哈希为键, 存于sqlite; 条目数或答案总字节数超出
+    上限时淘汰最久未使用者, 超过`ttl`的条目在读取时失效. 可在多个线程中使用.
+    """
+
+    def __init__(
+        self,
+        path: str = ANSWER_CACHE_PATH,
+        max_entries: int = DEFAULT_ANSWER_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_ANSWER_CACHE_MAX_BYTES,
+        ttl: float = DEFAULT_ANSWER_CACHE_TTL,
+        enabled: bool = DEFAULT_ANSWER_CACHE_ENABLED,
+    ) -> None:
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def from_resource(resource: Resource) -> "AnswerCache":
+        return AnswerCache(
+            max_entries=int(
+                resource.local_config_get(
+                    CFG_ANSWER_CACHE_MAX_ENTRIES, DEFAULT_ANSWER_CACHE_MAX_ENTRIES
+                )
+            ),
+            max_bytes=int(
+                resource.local_config_get(
+                    CFG_ANSWER_CACHE_MAX_BYTES, DEFAULT_ANSWER_CACHE_MAX_BYTES
+                )
+            ),
+            ttl=float(
+                resource.local_config_get(
+                    CFG_ANSWER_CACHE_TTL, DEFAULT_ANSWER_CACHE_TTL
+                )
+            ),
+            enabled=bool(
+                resource.local_config_get(
+                    CFG_ANSWER_CACHE_ENABLED, DEFAULT_ANSWER_CACHE_ENABLED
+                )
+            ),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """首次使用时才创建文件, 调用方需持有锁"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(_SCHEMA)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, content: OneProblemContent, language: Language) -> Optional[str]:
+        """命中时返回答案并更新其使用时间"""
+        if not self.enabled:
+            return None
+        key = content_key(content, language)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT answer, created_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                conn.commit()
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE answers SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return str(row[0])
+
+    def get_by_key(self, key: str) -> Optional[str]:
+        """按`content_key`读取未过期的答案, 不计入命中统计"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT answer, created_at FROM answers WHERE key = ?", (key,))
+                .fetchone()
+            )
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return str(row[0])
+
+    def contains(self, content: OneProblemContent, language: Language) -> bool:
+        """是否有未过期的缓存, 不计入命中统计"""
+        if not self.enabled:
+            return False
+        key = content_key(content, language)
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT created_at FROM answers WHERE key = ?", (key,))
+                .fetchone()
+            )
+        return row is not None and time.time() - row[0] <= self.ttl
+
+    def put(self, content: OneProblemContent, language: Language, answer: str) -> None:
+        """空答案不缓存"""
+        if not self.enabled or not answer:
+            return
+        key = content_key(content, language)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                (key, language.name, answer, len(answer.encode("utf-8")), now, now),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """保留最近使用的条目, 直到条目数与总字节数都不超过上限"""
+        kept = total = 0
+        stale = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM answers ORDER BY accessed_at DESC"
+        ):
+            if kept < self.max_entries and total + size <= self.max_bytes:
+                kept += 1
+                total += size
+            else:
+                stale.append((key,))
+        if stale:
+            conn.executemany("DELETE FROM answers WHERE key = ?", stale)
+            self.evicted += len(stale)
+
+    def invalidate(self, content: OneProblemContent, language: Language) -> bool:
+        """删除该题目与语言的缓存, 返回是否存在"""
+        key = content_key(content, language)
+        with self._lock:
+            conn = self._connect()
+            deleted = conn.execute("DELETE FROM answers WHERE key = ?", (key,)).rowcount
+            conn.commit()
+        return deleted > 0
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM answers")
+            conn.commit()
+
+    @property
+    def stats(self) -> AnswerCacheStats:
+        with self._lock:
+            entries, size = (
+                self._connect()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers")
+                .fetchone()
+            )
+            return AnswerCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                expired=self.expired,
+                evicted=self.evicted,
+                entries=int(entries),
+                bytes=int(size),
+            )
+
+    def describe(self) -> str:
+        if not self.enabled:
+            return "答案缓存: 未启用"
+        st = self.stats
+        return (
+            f"答案缓存: 命中{st['hits']}次, 未命中{st['misses']}次, "
+            f"过期{st['expired']}条, 淘汰{st['evicted']}条, "
+            f"现有{st['entries']}条({st['bytes'] / 1024:.1f} KiB)"
+        )
+
+    def __repr__(self) -> str:
+        return f"AnswerCache(path={self.path}, hits={self.hits}, misses={self.misses})"
+
+
+answer_cache = AnswerCache.from_resource(Resource())
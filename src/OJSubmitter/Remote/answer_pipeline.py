@@ -0,0 +1,207 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypedDict
+
+from ..Constant.answer import (
+    ANSWER_POLL_SLICE,
+    CFG_ANSWER_COMPLETION_ORDER,
+    CFG_ANSWER_LOOKAHEAD,
+    CFG_ANSWER_WORKERS,
+    DEFAULT_ANSWER_COMPLETION_ORDER,
+    DEFAULT_ANSWER_LOOKAHEAD,
+    DEFAULT_ANSWER_WORKERS,
+)
+from ..Crawler.crawler import LevelProblemPage
+from ..Resource import Resource
+
+AnswerProducer = Callable[[LevelProblemPage], str]
+# 生成答案前调用, 返回使用后的剩余额度, None表示未占用额度(如答案已缓存)
+Permit = Callable[[LevelProblemPage], Optional[int]]
+
+QUOTA_EXHAUSTED = "余额不足"
+
+
+class AnswerResult(TypedDict):
+    index: int  # 在题目列表中的位置
+    answer: str  # 失败时为空
+    error: str  # 生成答案时的异常, 成功时为空
+    elapsed: float  # sec, 生成答案用时
+
+
+class AnswerPipeline:
+    """答案生成与提交的生产者/消费者流水线
+
+    `workers`个线程按关卡顺序领取题目生成答案, 提交方迭代取出答案, 在其等待
+    提交间隔时后续题目的答案已在生成. 已生成未取出与正在生成的答案合计不超过
+    `workers + lookahead`个, 超出时暂停领取. `in_completion_order`为False时按
+    关卡顺序给出, 否则先完成者先给出.
+
+    给出`permit`时, 每题生成前查询并占用额度: 同时生成的数量不超过最近一次
+    查询的剩余额度(尚未查询到时只受`workers`限制), 额度用尽后其余题目以
+    `QUOTA_EXHAUSTED`失败.
+    """
+
+    def __init__(
+        self,
+        problems: List[LevelProblemPage],
+        produce: AnswerProducer,
+        lookahead: Optional[int] = None,
+        workers: Optional[int] = None,
+        in_completion_order: Optional[bool] = None,
+        permit: Optional[Permit] = None,
+    ) -> None:
+        resource = Resource()
+        if lookahead is None:
+            lookahead = int(
+                resource.local_config_get(
+                    CFG_ANSWER_LOOKAHEAD, DEFAULT_ANSWER_LOOKAHEAD
+                )
+            )
+        if workers is None:
+            workers = int(
+                resource.local_config_get(CFG_ANSWER_WORKERS, DEFAULT_ANSWER_WORKERS)
+            )
+        if in_completion_order is None:
+            in_completion_order = bool(
+                resource.local_config_get(
+                    CFG_ANSWER_COMPLETION_ORDER, DEFAULT_ANSWER_COMPLETION_ORDER
+                )
+            )
+        self.problems = problems
+        self.produce = produce
+        self.permit = permit
+        self.lookahead = max(1, lookahead)
+        self.workers = max(1, workers)
+        self.in_completion_order = in_completion_order
+        self.results: List[Optional[AnswerResult]] = [None] * len(problems)
+
+        self._done: "queue.Queue[AnswerResult]" = queue.Queue()
+        self._window = threading.Semaphore(self.workers + self.lookahead)
+        self._cond = threading.Condition()
+        self._running = 0
+        self._quota: Optional[int] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._dispatch, name="answer-dispatcher", daemon=True
+        )
+
+    def _acquire_window(self) -> bool:
+        while not self._stopped.is_set():
+            if self._window.acquire(timeout=ANSWER_POLL_SLICE):
+                return True
+        return False
+
+    def _width(self) -> int:
+        if self.permit is None:
+            return self.workers
+        if self._quota is None:
+            # 尚未有题目占用额度(如答案均已缓存), 不限制; 超额由permit自身拒绝
+            return self.workers
+        return min(self.workers, max(1, self._quota))
+
+    def _dispatch(self) -> None:
+        with ThreadPoolExecutor(self.workers, "answer-worker") as executor:
+            for index, problem in enumerate(self.problems):
+                if not self._acquire_window():
+                    return
+                with self._cond:
+                    while not self._stopped.is_set() and self._running >= self._width():
+                        self._cond.wait(ANSWER_POLL_SLICE)
+                    if self._stopped.is_set():
+                        return
+                    if self._quota is not None and self._quota <= 0:
+                        self._finish(
+                            AnswerResult(
+                                index=index,
+                                answer="",
+                                error=QUOTA_EXHAUSTED,
+                                elapsed=0.0,
+                            )
+                        )
+                        continue
+                    self._running += 1
+                executor.submit(self._generate, index, problem)
+
+    def _generate(self, index: int, problem: LevelProblemPage) -> None:
+        start = time.monotonic()
+        if self._stopped.is_set():
+            answer, error = "", "已停止"
+        else:
+            answer, error = self._answer(problem)
+        with self._cond:
+            self._running -= 1
+            self._cond.notify_all()
+        self._finish(
+            AnswerResult(
+                index=index,
+                answer=answer,
+                error=error,
+                elapsed=time.monotonic() - start,
+            )
+        )
+
+    def _answer(self, problem: LevelProblemPage) -> Tuple[str, str]:
+        """(答案, 异常)"""
+        try:
+            if self.permit is not None:
+                quota = self.permit(problem)
+                if quota is not None:
+                    with self._cond:
+                        self._quota = quota
+                        self._cond.notify_all()
+            return self.produce(problem), ""
+        except Exception as e:
+            return "", f"{type(e).__name__}: {e}"
+
+    def _finish(self, result: AnswerResult) -> None:
+        self.results[result["index"]] = result
+        self._done.put(result)
+
+    def _next_done(self) -> Optional[AnswerResult]:
+        while not self._stopped.is_set():
+            try:
+                return self._done.get(timeout=ANSWER_POLL_SLICE)
+            except queue.Empty:
+                continue
+        return None
+
+    def __iter__(self) -> Iterator[AnswerResult]:
+        """取出答案, 尚未生成时阻塞"""
+        if self._thread.ident is None:
+            self._thread.start()
+        buffered: Dict[int, AnswerResult] = {}
+        expected = 0
+        try:
+            for _ in self.problems:
+                if self.in_completion_order:
+                    result = self._next_done()
+                else:
+                    while expected not in buffered:
+                        done = self._next_done()
+                        if done is None:
+                            return
+                        buffered[done["index"]] = done
+                    result = buffered.pop(expected)
+                    expected += 1
+                if result is None:
+                    return
+                self._window.release()
+                yield result
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    @property
+    def ready(self) -> int:
+        """已生成、等待取出的答案数"""
+        return self._done.qsize()
+
+    def __repr__(self) -> str:
+        return (
+            f"AnswerPipeline(problems={len(self.problems)}, workers={self.workers}, "
+            f"lookahead={self.lookahead}, ready={self.ready})"
+        )
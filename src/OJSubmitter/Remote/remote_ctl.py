@@ -3,13 +3,24 @@ from typing import Callable, NoReturn, Optional
 
 import requests
 
+from ...OJSubmitter.Constant.endpoints import RemoteEndpoint
 from ...OJSubmitter.Constant.request_consts import Language
 from ...OJSubmitter.Constant.status import ConfigStatus
 from ...OJSubmitter.Crawler.crawler import LevelProblemPage
+from ...OJSubmitter.Transport.deadline import Deadline, timeouts
 from ...SecretAPI import SecretAPI
 from ...SecretAPI.remote import PermissionResponseParams, PermissionStatus, get_config
 from ...Util.common import dict_rget_safe
+from ..Constant.answer import (
+    CFG_SIMILAR_REUSE,
+    CFG_SIMILAR_REUSE_THRESHOLD,
+    DEFAULT_SIMILAR_REUSE,
+    DEFAULT_SIMILAR_REUSE_THRESHOLD,
+)
+from ..Resource import Resource
 from ..Typehint.remote_cfg import ConfigParams, ConfigResponseParams
+from .answer_cache import answer_cache
+from .similar_index import SimilarAnswer, similar_index
 
 CONFIG_NAME = SecretAPI.CONFIG_NAME
 GET_CONFIG_URL = SecretAPI.GET_CONFIG_URL
@@ -38,12 +49,94 @@ class RemoteController:
         self,
         problem: LevelProblemPage,
         language: Language,
-        timeout: float = 60,
+        timeout: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+        use_cache: bool = True,
     ) -> str:
-        return get_ai_answer(problem, language, timeout)
+        """先查询`answer_cache`与可复用的相似题目, 未命中时请求并缓存非空答案"""
+        if use_cache:
+            cached = self.cached_answer(problem, language)
+            if cached is None:
+                similar = self.reusable_answer(problem, language)
+                cached = similar["answer"] if similar is not None else None
+                if cached is not None:
+                    self._remember(problem, language, cached)
+            if cached is not None:
+                return cached
+        if timeout is None:
+            timeout = timeouts.effective(RemoteEndpoint.AI_ANSWER, deadline)
+        elif (deadline := Deadline.resolve(deadline)) is not None:
+            timeout = deadline.timeout(timeout, RemoteEndpoint.AI_ANSWER)
+        answer = get_ai_answer(problem, language, timeout)
+        if use_cache and answer and problem.page_content.get("description"):
+            self._remember(problem, language, answer)
+        return answer
 
-    def check_remote_connection(self) -> Optional[NoReturn]:
-        resp = requests.post(GET_CONFIG_URL, timeout=5)
+    @staticmethod
+    def _remember(problem: LevelProblemPage, language: Language, answer: str) -> None:
+        answer_cache.put(problem.page_content, language, answer)
+        similar_index.add(problem.page_content, language)
+
+    def similar_answer(
+        self, problem: LevelProblemPage, language: Language
+    ) -> Optional[SimilarAnswer]:
+        """已回答过的最相似题目及其答案, 可用于复用或参考"""
+        content = problem.page_content
+        if not answer_cache.enabled or not content.get("description"):
+            return None
+        return similar_index.lookup(content, language)
+
+    def reusable_answer(
+        self, problem: LevelProblemPage, language: Language
+    ) -> Optional[SimilarAnswer]:
+        """开启`similar_reuse`, 代码模板完全一致且相似度不低于阈值时可直接复用的答案"""
+        resource = Resource()
+        if not resource.local_config_get(CFG_SIMILAR_REUSE, DEFAULT_SIMILAR_REUSE):
+            return None
+        threshold = float(
+            resource.local_config_get(
+                CFG_SIMILAR_REUSE_THRESHOLD, DEFAULT_SIMILAR_REUSE_THRESHOLD
+            )
+        )
+        content = problem.page_content
+        if not answer_cache.enabled or not content.get("description"):
+            return None
+        # 模板不同时即使描述相近, 旧答案也无法直接填入
+        similar = similar_index.lookup(content, language, same_template=True)
+        if similar is None or similar["similarity"] < threshold:
+            return None
+        return similar
+
+    def cached_answer(
+        self, problem: LevelProblemPage, language: Language
+    ) -> Optional[str]:
+        """缓存中的答案; 题目内容为空时不查询"""
+        content = problem.page_content
+        if not content.get("description"):
+            return None
+        return answer_cache.get(content, language)
+
+    def invalidate_answer(self, problem: LevelProblemPage, language: Language) -> bool:
+        """答案未通过评测时删除其缓存, 以免再次提交; 返回是否存在"""
+        content = problem.page_content
+        if not content.get("description"):
+            return False
+        return answer_cache.invalidate(content, language)
+
+    def has_cached_answer(self, problem: LevelProblemPage, language: Language) -> bool:
+        content = problem.page_content
+        if not content.get("description"):
+            return False
+        return answer_cache.contains(content, language) or (
+            self.reusable_answer(problem, language) is not None
+        )
+
+    def check_remote_connection(
+        self, deadline: Optional[Deadline] = None
+    ) -> Optional[NoReturn]:
+        resp = requests.post(
+            GET_CONFIG_URL, timeout=timeouts.effective(RemoteEndpoint.CONFIG, deadline)
+        )
         resp.raise_for_status()
         return None
 
@@ -0,0 +1,258 @@
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import zlib
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, Optional, Set, Tuple, TypedDict
+
+from ..Constant.answer import (
+    SIMILAR_BANDS,
+    SIMILAR_MIN_SCORE,
+    SIMILAR_ROWS,
+    SIMILAR_SHINGLE_SIZE,
+)
+from ..Constant.request_consts import Language
+from ..Constant.resource import ANSWER_CACHE_PATH
+from ..Typehint.problem import OneProblemContent, OneProblemContentLiteral
+from .answer_cache import AnswerCache, answer_cache, content_key, normalize_text
+
+# 参与相似度的字段: 样例与代码模板常被改动, 不计入
+SIMILAR_FIELDS: Tuple[OneProblemContentLiteral, ...] = (
+    "description",
+    "input",
+    "output",
+)
+
+_PRIME = (1 << 61) - 1
+_BINS = SIMILAR_BANDS * SIMILAR_ROWS
+# 桶内取值的上界, 空桶借用右侧桶的值时按距离加上它的倍数
+_BIN_RANGE = _PRIME // _BINS + 1
+_rng = random.Random(20251018)  # 固定种子, 已保存的签名才能与新签名比较
+_A, _B = _rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)
+_SPACE_RE = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash_signatures (
+    key TEXT PRIMARY KEY,
+    language TEXT NOT NULL,
+    template TEXT NOT NULL,
+    signature BLOB NOT NULL
+)
+"""
+
+Signature = Tuple[int, ...]
+# (语言, 代码模板哈希, 签名)
+_Entry = Tuple[Language, str, Signature]
+
+
+class SimilarAnswer(TypedDict):
+    key: str  # 旧题目的content_key
+    answer: str
+    similarity: float  # 估计的Jaccard相似度, 0~1
+
+
+def shingles(content: OneProblemContent) -> Set[int]:
+    """描述与输入输出说明的字符k-gram哈希; 忽略空白与大小写
+
+    数字保留原样: 只改了数据范围或常数的题目答案往往不同, 不应视为重复.
+    """
+    text = " ".join(content[field] for field in SIMILAR_FIELDS)
+    text = _SPACE_RE.sub("", text.lower())
+    if len(text) <= SIMILAR_SHINGLE_SIZE:
+        return {zlib.crc32(text.encode("utf-8"))} if text else set()
+    return {
+        zlib.crc32(text[i : i + SIMILAR_SHINGLE_SIZE].encode("utf-8"))
+        for i in range(len(text) - SIMILAR_SHINGLE_SIZE + 1)
+    }
+
+
+def template_key(content: OneProblemContent) -> str:
+    """规范化后代码模板的哈希, 复用答案要求模板完全一致"""
+    return hashlib.sha256(
+        normalize_text(content["code_with_filling"]).encode("utf-8")
+    ).hexdigest()
+
+
+def minhash(hashes: Set[int]) -> Optional[Signature]:
+    """单次置换的MinHash(one permutation hashing)
+
+    每个shingle只哈希一次, 按哈希值分到`_BINS`个桶中各取最小值;
+    空桶按旋转加密化(rotation densification)取右侧(循环)最近的非空桶.
+    """
+    if not hashes:
+        return None
+    bins: List[Optional[int]] = [None] * _BINS
+    for x in hashes:
+        value, index = divmod((_A * x + _B) % _PRIME, _BINS)
+        current = bins[index]
+        if current is None or value < current:
+            bins[index] = value
+
+    signature: List[int] = []
+    for i in range(_BINS):
+        for distance in range(_BINS):
+            nearest = bins[(i + distance) % _BINS]
+            if nearest is not None:
+                signature.append(nearest + distance * _BIN_RANGE)
+                break
+    return tuple(signature)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def _bands(signature: Signature) -> List[Signature]:
+    return [
+        signature[i : i + SIMILAR_ROWS] for i in range(0, len(signature), SIMILAR_ROWS)
+    ]
+
+
+class SimilarityIndex:
+    """已回答题目的近似重复索引(MinHash + LSH)
+
+    对描述与输入输出说明做字符shingling, 计算MinHash签名并分段放入LSH桶;
+    查询时只与至少一段完全相同的题目比较签名, 并可要求代码模板完全一致.
+    签名与答案缓存存于同一sqlite
+    文件, 首次查询时载入内存. 答案本身仍由`AnswerCache`保存, 已被淘汰或过期的
+    题目在查询时移出索引.
+    """
+
+    def __init__(
+        self, cache: AnswerCache = answer_cache, path: str = ANSWER_CACHE_PATH
+    ) -> None:
+        self.cache = cache
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._signatures: Dict[str, _Entry] = {}
+        self._buckets: DefaultDict[Tuple[int, Signature], Set[str]] = defaultdict(set)
+
+    def _connect(self) -> sqlite3.Connection:
+        """首次使用时载入全部签名, 调用方需持有锁"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # 旧表中的签名(每个哈希各做一次置换)与单次置换的签名不可比较, 丢弃后随新答案重建
+            self._conn.execute("DROP TABLE IF EXISTS signatures")
+            self._conn.execute(_SCHEMA)
+            self._conn.commit()
+            for key, language, template, blob in self._conn.execute(
+                "SELECT key, language, template, signature FROM minhash_signatures"
+            ):
+                signature = _unpack(blob)
+                # 签名参数变化后旧签名不可比较, 跳过
+                if language in Language.__members__ and len(signature) == _BINS:
+                    self._insert(key, (Language[language], template, signature))
+        return self._conn
+
+    def _insert(self, key: str, entry: _Entry) -> None:
+        self._signatures[key] = entry
+        for band in enumerate(_bands(entry[2])):
+            self._buckets[band].add(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._signatures.pop(key, None)
+        if entry is None:
+            return
+        for band in enumerate(_bands(entry[2])):
+            self._buckets[band].discard(key)
+            if not self._buckets[band]:
+                del self._buckets[band]
+        self._connect().execute("DELETE FROM minhash_signatures WHERE key = ?", (key,))
+
+    def add(self, content: OneProblemContent, language: Language) -> None:
+        """登记已缓存答案的题目"""
+        signature = minhash(shingles(content))
+        if signature is None:
+            return
+        key = content_key(content, language)
+        template = template_key(content)
+        with self._lock:
+            conn = self._connect()
+            self._remove(key)
+            self._insert(key, (language, template, signature))
+            conn.execute(
+                "INSERT OR REPLACE INTO minhash_signatures VALUES (?, ?, ?, ?)",
+                (key, language.name, template, _pack(signature)),
+            )
+            conn.commit()
+
+    def candidates(
+        self,
+        content: OneProblemContent,
+        language: Language,
+        same_template: bool = False,
+    ) -> List[Tuple[str, float]]:
+        """同语言的其他相似题目(content_key, 估计相似度), 相似度从高到低
+
+        `same_template`为True时只保留代码模板(规范化后)完全一致的题目.
+        """
+        signature = minhash(shingles(content))
+        if signature is None:
+            return []
+        own = content_key(content, language)
+        template = template_key(content) if same_template else None
+        with self._lock:
+            self._connect()
+            keys: Set[str] = set()
+            for band in enumerate(_bands(signature)):
+                keys |= self._buckets.get(band, set())
+            scored = [
+                (key, similarity(signature, self._signatures[key][2]))
+                for key in keys
+                if key != own
+                and self._signatures[key][0] == language
+                and template in (None, self._signatures[key][1])
+            ]
+        return sorted(
+            (c for c in scored if c[1] >= SIMILAR_MIN_SCORE),
+            key=lambda c: c[1],
+            reverse=True,
+        )
+
+    def lookup(
+        self,
+        content: OneProblemContent,
+        language: Language,
+        same_template: bool = False,
+    ) -> Optional[SimilarAnswer]:
+        """最相似且答案仍在缓存中的旧题目, `same_template`见`candidates`"""
+        stale: List[str] = []
+        found: Optional[SimilarAnswer] = None
+        for key, score in self.candidates(content, language, same_template):
+            answer = self.cache.get_by_key(key)
+            if answer is None:
+                stale.append(key)
+                continue
+            found = SimilarAnswer(key=key, answer=answer, similarity=score)
+            break
+        if stale:
+            with self._lock:
+                for key in stale:
+                    self._remove(key)
+                self._connect().commit()
+        return found
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._connect()
+            return len(self._signatures)
+
+    def __repr__(self) -> str:
+        return f"SimilarityIndex(path={self.path})"
+
+
+def _pack(signature: Signature) -> bytes:
+    return struct.pack(f"<{len(signature)}Q", *signature)
+
+
+def _unpack(blob: bytes) -> Signature:
+    return struct.unpack(f"<{len(blob) // 8}Q", blob)
+
+
+similar_index = SimilarityIndex()
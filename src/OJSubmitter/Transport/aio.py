@@ -0,0 +1,46 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from ..Constant.transport import CFG_ASYNC_CONCURRENCY, DEFAULT_ASYNC_CONCURRENCY
+from ..Resource import Resource
+
+_T = TypeVar("_T")
+
+
+class AsyncBridge:
+    """将阻塞的Crawler请求调度到有界线程池, 供asyncio事件循环await
+
+    并发上限即线程池宽度, 同一进程内所有事件循环共享.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_ASYNC_CONCURRENCY) -> None:
+        self._concurrency = max(1, concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._concurrency, thread_name_prefix="oj-aio"
+        )
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    async def run(self, fn: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        """在线程池中执行`fn`, 并带上当前上下文(包括Deadline)"""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(ctx.run, fn, *args, **kwargs)
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __repr__(self) -> str:
+        return f"AsyncBridge(concurrency={self._concurrency})"
+
+
+async_bridge = AsyncBridge(
+    int(Resource().local_config_get(CFG_ASYNC_CONCURRENCY, DEFAULT_ASYNC_CONCURRENCY))
+)
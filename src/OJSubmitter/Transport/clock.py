@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Optional, Tuple, TypedDict
+
+from ..Constant.transport import CLOCK_FILTER_SIZE, CLOCK_WINDOW
+
+DATE_RESOLUTION = 1.0  # sec, HTTP Date头精确到秒
+
+
+class ClockSample(TypedDict):
+    low: float  # 偏差下界, sec
+    high: float  # 偏差上界, sec
+    rtt: float  # sec
+
+
+class ClockEstimate(TypedDict):
+    offset: float  # sec, 服务器时间 - 本地时间
+    error: float  # sec, 估计误差(区间半宽)
+    rtt: float  # sec, 参与估计的最小往返时间
+    samples: int
+
+
+class ClockSync:
+    """根据响应的Date头估计服务器时钟偏差
+
+    每个响应给出偏差的一个区间: 服务器在本地[发送, 接收]之间的某一时刻写下
+    Date(截断到秒), 因此偏差∈(Date - 接收, Date + 1 - 发送). 类似NTP的时钟
+    过滤, 只取最近样本中往返时间最小的若干个求区间交集; 交集为空(时钟跳变)
+    时退回到单个最小往返样本.
+    """
+
+    def __init__(
+        self, window: int = CLOCK_WINDOW, filter_size: int = CLOCK_FILTER_SIZE
+    ) -> None:
+        self.filter_size = max(1, filter_size)
+        self._lock = threading.Lock()
+        self._samples: Deque[ClockSample] = deque(maxlen=max(1, window))
+        self._estimate: Optional[ClockEstimate] = None
+
+    @staticmethod
+    def parse_date(value: str) -> Optional[float]:
+        try:
+            return parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError, IndexError):
+            return None
+
+    def observe(self, date_header: Optional[str], sent: float, received: float) -> None:
+        """记录一个响应, `sent`/`received`为本地时间戳(time.time())"""
+        if not date_header or received < sent:
+            return
+        server = self.parse_date(date_header)
+        if server is None:
+            return
+        sample = ClockSample(
+            low=server - received,
+            high=server + DATE_RESOLUTION - sent,
+            rtt=received - sent,
+        )
+        with self._lock:
+            self._samples.append(sample)
+            self._estimate = None
+
+    def _bounds(self) -> Tuple[float, float, float]:
+        best = sorted(self._samples, key=lambda s: s["rtt"])[: self.filter_size]
+        low = max(s["low"] for s in best)
+        high = min(s["high"] for s in best)
+        if low > high:
+            low, high = best[0]["low"], best[0]["high"]
+        return low, high, best[0]["rtt"]
+
+    @property
+    def estimate(self) -> Optional[ClockEstimate]:
+        with self._lock:
+            if self._estimate is None and self._samples:
+                low, high, rtt = self._bounds()
+                self._estimate = ClockEstimate(
+                    offset=(low + high) / 2,
+                    error=(high - low) / 2,
+                    rtt=rtt,
+                    samples=len(self._samples),
+                )
+            return self._estimate
+
+    @property
+    def offset(self) -> float:
+        estimate = self.estimate
+        return 0.0 if estimate is None else estimate["offset"]
+
+    def server_now(self) -> float:
+        """估计的服务器当前时间戳, 尚无样本时为本地时间"""
+        return time.time() + self.offset
+
+    def describe(self) -> str:
+        estimate = self.estimate
+        if estimate is None:
+            return "服务器时钟偏差: 暂无样本"
+        return (
+            f"服务器时钟偏差{estimate['offset']:+.3f}秒"
+            f"(误差±{estimate['error']:.3f}秒, 最小往返{estimate['rtt'] * 1000:.0f}ms, "
+            f"{estimate['samples']}个样本)"
+        )
+
+    def __repr__(self) -> str:
+        return f"ClockSync(offset={self.offset:+.3f})"
+
+
+server_clock = ClockSync()
@@ -0,0 +1,89 @@
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional, Self
+
+from ..Constant.endpoints import CFG_TIMEOUTS, DEFAULT_TIMEOUT, DEFAULT_TIMEOUTS
+from ..Resource import Resource
+from .errors import DeadlineExceeded
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("oj_deadline", default=None)
+
+
+class Deadline:
+    """调用链的截止时间
+
+    可显式传入各请求方法, 也可作为上下文管理器使用, 使其中(同一线程/协程内)的
+    所有请求都以剩余时间作为超时; 嵌套时取更早的截止时间.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.expires_at = time.monotonic() + seconds
+        self._tokens: List[Token[Optional[Deadline]]] = []
+
+    @staticmethod
+    def current() -> Optional["Deadline"]:
+        return _current.get()
+
+    @staticmethod
+    def resolve(deadline: Optional["Deadline"]) -> Optional["Deadline"]:
+        return deadline if deadline is not None else _current.get()
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, what: str = "") -> None:
+        if self.expired:
+            raise DeadlineExceeded(
+                f"Deadline exceeded{f' before {what}' if what else ''}"
+            )
+
+    def timeout(self, default: float, what: str = "") -> float:
+        """取`default`与剩余时间中较小者作为单次请求的超时, 已过期时抛出DeadlineExceeded"""
+        self.check(what)
+        return min(default, self.remaining())
+
+    def __enter__(self) -> Self:
+        outer = _current.get()
+        if outer is not None and outer.expires_at < self.expires_at:
+            self.expires_at = outer.expires_at
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        _current.reset(self._tokens.pop())
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f})"
+
+
+class TimeoutTable:
+    """各端点的默认超时"""
+
+    def __init__(self, overrides: Optional[Dict[str, float]] = None) -> None:
+        self.timeouts: Dict[str, float] = dict(DEFAULT_TIMEOUTS)
+        if overrides:
+            self.timeouts.update({k: float(v) for k, v in overrides.items()})
+
+    @staticmethod
+    def from_resource(resource: Resource) -> "TimeoutTable":
+        overrides = resource.local_config_get(CFG_TIMEOUTS)
+        return TimeoutTable(overrides if isinstance(overrides, dict) else None)
+
+    def get(self, endpoint: str) -> float:
+        return self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+
+    def effective(
+        self, endpoint: str, deadline: Optional[Deadline] = None, what: str = ""
+    ) -> float:
+        default = self.get(endpoint)
+        deadline = Deadline.resolve(deadline)
+        if deadline is None:
+            return default
+        return deadline.timeout(default, what or endpoint)
+
+
+timeouts = TimeoutTable.from_resource(Resource())
@@ -0,0 +1,189 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, TypedDict
+
+import requests
+
+from ..Constant.endpoints import (
+    CFG_OJ_BASE_URLS,
+    DEFAULT_OJ_BASE_URLS,
+    ENDPOINT_COOLDOWN,
+    ENDPOINT_LATENCY_ALPHA,
+    ENDPOINT_MAX_FAILURES,
+    ENDPOINT_PROBE_INTERVAL,
+    ENDPOINT_PROBE_TIMEOUT,
+    PROBE_PATH,
+)
+from ..Resource import Resource
+
+
+class EndpointState(TypedDict):
+    base_url: str
+    latency: Optional[float]  # EWMA, sec
+    failures: int
+    healthy: bool
+    down_since: float
+
+
+def normalize_base_urls(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return list(DEFAULT_OJ_BASE_URLS)
+
+    urls: List[str] = []
+    for v in value:
+        url = str(v).strip().rstrip("/")
+        if url and url not in urls:
+            urls.append(url)
+    return urls or list(DEFAULT_OJ_BASE_URLS)
+
+
+class EndpointRegistry:
+    """OJ节点注册表
+
+    读请求分发到近期延迟最低的健康节点, 失败节点冷却后重新参与选择;
+    会话相关请求(登录/校验/提交)固定在会话所属节点.
+    """
+
+    def __init__(self, base_urls: List[str]) -> None:
+        self._lock = threading.Lock()
+        self._states: Dict[str, EndpointState] = {}
+        self._pinned: Dict[str, str] = {}
+        self._last_probe = 0.0
+        self._probing = False
+        self.set_base_urls(base_urls)
+
+    @staticmethod
+    def from_resource(resource: Resource) -> "EndpointRegistry":
+        return EndpointRegistry(
+            normalize_base_urls(resource.local_config_get(CFG_OJ_BASE_URLS))
+        )
+
+    def set_base_urls(self, base_urls: List[str]) -> None:
+        urls = normalize_base_urls(base_urls)
+        with self._lock:
+            self._states = {
+                url: self._states.get(url)
+                or EndpointState(
+                    base_url=url,
+                    latency=None,
+                    failures=0,
+                    healthy=True,
+                    down_since=0.0,
+                )
+                for url in urls
+            }
+            self._pinned = {k: v for k, v in self._pinned.items() if v in urls}
+
+    @property
+    def base_urls(self) -> List[str]:
+        return list(self._states)
+
+    @property
+    def primary(self) -> str:
+        return next(iter(self._states))
+
+    def _is_available(self, state: EndpointState, now: float) -> bool:
+        return state["healthy"] or now - state["down_since"] > ENDPOINT_COOLDOWN
+
+    def ranked(self) -> List[str]:
+        """按可用性与延迟排序的节点列表, 未测量过的节点优先以获取样本"""
+        now = time.monotonic()
+        with self._lock:
+            states = list(self._states.values())
+        return [
+            s["base_url"]
+            for s in sorted(
+                states,
+                key=lambda s: (
+                    not self._is_available(s, now),
+                    -1.0 if s["latency"] is None else s["latency"],
+                ),
+            )
+        ]
+
+    def read_candidates(self) -> List[str]:
+        if len(self._states) > 1:
+            self.maybe_probe()
+        return self.ranked()
+
+    def pick_read(self) -> str:
+        return self.read_candidates()[0]
+
+    def session_host(self, key: str) -> str:
+        with self._lock:
+            host = self._pinned.get(key)
+        if host is not None:
+            return host
+        host = self.pick_read()
+        with self._lock:
+            return self._pinned.setdefault(key, host)
+
+    def pin(self, key: str, base_url: str) -> None:
+        with self._lock:
+            self._pinned[key] = base_url
+
+    def unpin(self, key: str) -> None:
+        with self._lock:
+            self._pinned.pop(key, None)
+
+    def record_success(self, base_url: str, latency: float) -> None:
+        with self._lock:
+            state = self._states.get(base_url)
+            if state is None:
+                return
+            prev = state["latency"]
+            state["latency"] = (
+                latency
+                if prev is None
+                else ENDPOINT_LATENCY_ALPHA * latency
+                + (1 - ENDPOINT_LATENCY_ALPHA) * prev
+            )
+            state["failures"] = 0
+            state["healthy"] = True
+
+    def record_failure(self, base_url: str) -> None:
+        with self._lock:
+            state = self._states.get(base_url)
+            if state is None:
+                return
+            state["failures"] += 1
+            if state["failures"] >= ENDPOINT_MAX_FAILURES or not state["healthy"]:
+                state["healthy"] = False
+                state["down_since"] = time.monotonic()
+
+    def probe(self, base_url: str) -> Optional[float]:
+        start = time.monotonic()
+        try:
+            requests.head(base_url + PROBE_PATH, timeout=ENDPOINT_PROBE_TIMEOUT)
+        except requests.RequestException:
+            self.record_failure(base_url)
+            return None
+        latency = time.monotonic() - start
+        self.record_success(base_url, latency)
+        return latency
+
+    def probe_all(self) -> Dict[str, Optional[float]]:
+        self._last_probe = time.monotonic()
+        return {url: self.probe(url) for url in self.base_urls}
+
+    def maybe_probe(self) -> None:
+        """探测结果过期时在后台线程中重新测量所有节点"""
+        with self._lock:
+            now = time.monotonic()
+            if self._probing or now - self._last_probe < ENDPOINT_PROBE_INTERVAL:
+                return
+            self._probing = True
+            self._last_probe = now
+
+        def run() -> None:
+            try:
+                self.probe_all()
+            finally:
+                self._probing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def __repr__(self) -> str:
+        return f"EndpointRegistry(base_urls={self.base_urls})"
@@ -0,0 +1,17 @@
+import requests
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """节点处于熔断状态, 请求未发出"""
+
+    def __init__(self, host: str) -> None:
+        super().__init__(f"Circuit open for {host}")
+        self.host = host
+
+
+class SubmitNotRetriedError(requests.ConnectionError):
+    """提交请求失败且无法确认是否已被OJ接收, 因此不自动重试"""
+
+
+class DeadlineExceeded(requests.Timeout):
+    """调用链的截止时间已过, 剩余工作不再发起"""
@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, TypedDict
+
+from ..Constant.transport import (
+    CFG_RATE_LIMITS,
+    DEFAULT_RATE_LIMITS,
+    LimitScope,
+    TrafficKind,
+)
+from ..Resource import Resource
+
+RateTable = Dict[TrafficKind, Dict[LimitScope, Tuple[float, float]]]
+
+
+class LimiterStats(TypedDict):
+    acquired: int
+    delayed: int
+    total_wait: float  # sec
+    max_wait: float  # sec
+
+
+class TokenBucket:
+    """预约式令牌桶: 令牌不足时允许透支, 调用方按`wait_time`等待以保持先来先得"""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, now: float) -> float:
+        """补充令牌后, 取得一个令牌需要等待的时间; 不消耗令牌"""
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = max(now, self.updated)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+def parse_rate_table(value: Any) -> RateTable:
+    """合并local_config中的配置, 格式: {"read": {"host": [rate, burst], ...}, ...}"""
+    table: RateTable = {k: dict(v) for k, v in DEFAULT_RATE_LIMITS.items()}
+    if not isinstance(value, dict):
+        return table
+
+    for kind in TrafficKind:
+        scopes = value.get(kind.value)
+        if not isinstance(scopes, dict):
+            continue
+        for scope in LimitScope:
+            budget = scopes.get(scope.value)
+            if isinstance(budget, (list, tuple)) and len(budget) == 2:
+                table[kind][scope] = (float(budget[0]), float(budget[1]))
+    return table
+
+
+class RateLimiter:
+    """进程级限流器, 每个请求同时消耗(节点, 类型)与(节点, 账号, 类型)两个令牌桶"""
+
+    def __init__(self, table: RateTable) -> None:
+        self.table = table
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[Any, ...], TokenBucket] = {}
+        self._stats: Dict[TrafficKind, LimiterStats] = {
+            kind: LimiterStats(acquired=0, delayed=0, total_wait=0.0, max_wait=0.0)
+            for kind in TrafficKind
+        }
+
+    @staticmethod
+    def from_resource(resource: Resource) -> "RateLimiter":
+        return RateLimiter(parse_rate_table(resource.local_config_get(CFG_RATE_LIMITS)))
+
+    def _bucket(self, scope: LimitScope, kind: TrafficKind, *key: str) -> TokenBucket:
+        bucket_key = (scope, kind, *key)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            rate, capacity = self.table[kind][scope]
+            bucket = self._buckets[bucket_key] = TokenBucket(rate, capacity)
+        return bucket
+
+    def reserve(
+        self,
+        host: str,
+        account: str,
+        kind: TrafficKind,
+        max_wait: Optional[float] = None,
+    ) -> Optional[float]:
+        """预约一次请求, 返回需要等待的时间
+
+        需要等待的时间不小于`max_wait`时不消耗令牌并返回None.
+        """
+        now = time.monotonic()
+        with self._lock:
+            buckets = (
+                self._bucket(LimitScope.HOST, kind, host),
+                self._bucket(LimitScope.ACCOUNT, kind, host, account),
+            )
+            wait = max(bucket.wait_time(now) for bucket in buckets)
+            if max_wait is not None and wait >= max_wait:
+                return None
+            for bucket in buckets:
+                bucket.take()
+            stats = self._stats[kind]
+            stats["acquired"] += 1
+            if wait > 0:
+                stats["delayed"] += 1
+                stats["total_wait"] += wait
+                stats["max_wait"] = max(stats["max_wait"], wait)
+        return wait
+
+    @property
+    def stats(self) -> Dict[str, LimiterStats]:
+        with self._lock:
+            return {k.value: LimiterStats(**v) for k, v in self._stats.items()}
+
+    def __repr__(self) -> str:
+        return f"RateLimiter(buckets={len(self._buckets)})"
@@ -0,0 +1,153 @@
+import enum
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, cast
+
+from ..Constant.transport import (
+    CFG_RESILIENCE,
+    DEFAULT_RESILIENCE,
+    ResilienceParams,
+)
+from ..Resource import Resource
+
+
+def parse_resilience(value: Any) -> ResilienceParams:
+    params: Dict[str, Any] = dict(DEFAULT_RESILIENCE)
+    if isinstance(value, dict):
+        for k, default in DEFAULT_RESILIENCE.items():
+            if k in value:
+                params[k] = cast(Callable[[Any], Any], type(default))(value[k])
+    return cast(ResilienceParams, params)
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int, base: float, cap: float) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base = base
+        self.cap = cap
+
+    def backoff(self, attempt: int) -> float:
+        """第`attempt`次重试前的等待时间(full jitter)"""
+        return random.uniform(0, min(self.cap, self.base * 2**attempt))
+
+
+class BreakerState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """按节点熔断: 连续失败达到阈值后拒绝请求, 冷却后仅放行一个试探请求"""
+
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        self.threshold = max(1, threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: Dict[str, int] = {}  # 节点 -> 持有试探名额的线程
+
+    def state(self, host: str) -> BreakerState:
+        opened_at = self._opened_at.get(host)
+        if opened_at is None:
+            return BreakerState.CLOSED
+        if time.monotonic() - opened_at >= self.reset_timeout:
+            return BreakerState.HALF_OPEN
+        return BreakerState.OPEN
+
+    def allow(self, host: str) -> bool:
+        with self._lock:
+            state = self.state(host)
+            if state is BreakerState.CLOSED:
+                return True
+            if state is BreakerState.HALF_OPEN and host not in self._trial:
+                self._trial[host] = threading.get_ident()
+                return True
+            return False
+
+    def release(self, host: str) -> None:
+        """试探请求结束但未记录结果(如因截止时间放弃)时, 允许再次试探
+
+        只归还当前线程持有的名额, 其他请求结束时调用不会影响进行中的试探.
+        """
+        with self._lock:
+            if self._trial.get(host) == threading.get_ident():
+                del self._trial[host]
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            self._trial.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.threshold or host in self._opened_at:
+                self._opened_at[host] = time.monotonic()
+                self._trial.pop(host, None)
+
+
+class LatencyTracker:
+    """记录各路径近期的请求延迟, 用于计算对冲请求的触发阈值"""
+
+    def __init__(self, window: int = 200) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, path: str, latency: float) -> None:
+        with self._lock:
+            samples = self._samples.get(path)
+            if samples is None:
+                samples = self._samples[path] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def percentile(self, path: str, q: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(path, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, int(q * len(samples)))
+        return samples[index]
+
+
+class Resilience:
+    def __init__(self, params: ResilienceParams) -> None:
+        self.params = params
+        self.retry = RetryPolicy(
+            params["max_attempts"], params["backoff_base"], params["backoff_max"]
+        )
+        self.breaker = CircuitBreaker(
+            params["breaker_threshold"], params["breaker_reset"]
+        )
+        self.latency = LatencyTracker()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"retried": 0, "hedged": 0}
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    @staticmethod
+    def from_resource(resource: Resource) -> "Resilience":
+        return Resilience(parse_resilience(resource.local_config_get(CFG_RESILIENCE)))
+
+    def hedge_delay(self, path: str) -> Optional[float]:
+        if not self.params["hedge_reads"]:
+            return None
+        return self.latency.percentile(
+            path, self.params["hedge_percentile"], self.params["hedge_min_samples"]
+        )
+
+    def __repr__(self) -> str:
+        return f"Resilience(max_attempts={self.retry.max_attempts})"
@@ -0,0 +1,247 @@
+import contextlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterator, List, TypedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from ..Constant.transport import (
+    DEFAULT_CONNECTIONS_PER_SESSION,
+    DEFAULT_SESSION_IDLE_TIMEOUT,
+    DEFAULT_SESSION_POOL_SIZE,
+)
+
+
+class PoolStats(TypedDict):
+    sessions_created: int
+    sessions_reused: int
+    sessions_evicted: int
+    requests_sent: int
+    connections_opened: int
+    connections_reused: int
+
+
+class _ConnectionCounter:
+    """统计一个会话的底层TCP连接新建次数与请求次数"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def on_new_connection(self) -> None:
+        with self._lock:
+            self.opened += 1
+
+    def on_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def reused(self) -> int:
+        with self._lock:
+            return max(0, self.requests - self.opened)
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    counter: _ConnectionCounter
+
+    def _new_conn(self) -> HTTPConnection:
+        self.counter.on_new_connection()
+        return super()._new_conn()  # type: ignore[return-value]
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    counter: _ConnectionCounter
+
+    def _new_conn(self) -> HTTPSConnection:
+        self.counter.on_new_connection()
+        return super()._new_conn()  # type: ignore[return-value]
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        # init_poolmanager在基类构造时调用, 计数器需先于其创建
+        self.counter = _ConnectionCounter()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(
+        self, connections: int, maxsize: int, block: bool = False, **pool_kwargs: Any
+    ) -> None:
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        # 连接池由PoolManager按类创建, 以子类把本会话的计数器交给它们
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type(
+                "_CountingHTTPConnectionPool",
+                (_CountingHTTPConnectionPool,),
+                {"counter": self.counter},
+            ),
+            "https": type(
+                "_CountingHTTPSConnectionPool",
+                (_CountingHTTPSConnectionPool,),
+                {"counter": self.counter},
+            ),
+        }
+
+    def send(self, *args: Any, **kwargs: Any) -> requests.Response:
+        self.counter.on_request()
+        return super().send(*args, **kwargs)
+
+
+class _PooledSession:
+    """池中的一个会话; 被淘汰时若仍有请求在用, 等最后一个归还后才关闭"""
+
+    def __init__(self, session: requests.Session, counter: _ConnectionCounter) -> None:
+        self.session = session
+        self.counter = counter
+        self.last_used = time.monotonic()
+        self.leases = 0
+        self.retired = False
+
+
+class SessionPool:
+    """按账号分配keep-alive会话的有界池
+
+    超过`max_size`时淘汰最久未使用的会话, 空闲超过`idle_timeout`秒的会话在下次获取时关闭.
+    经`lease`使用的会话被淘汰时推迟到归还后关闭, 不会打断正在进行的请求.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_SESSION_POOL_SIZE,
+        idle_timeout: float = DEFAULT_SESSION_IDLE_TIMEOUT,
+        connections_per_session: int = DEFAULT_CONNECTIONS_PER_SESSION,
+    ) -> None:
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.connections_per_session = connections_per_session
+
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict[str, _PooledSession] = OrderedDict()
+        self._created = 0
+        self._reused = 0
+        self._evicted = 0
+        # 已关闭会话的连接统计
+        self._closed_requests = 0
+        self._closed_opened = 0
+        self._closed_reused = 0
+
+    def _new_session(self) -> _PooledSession:
+        session = requests.Session()
+        adapter = _CountingAdapter(
+            pool_connections=1,
+            pool_maxsize=self.connections_per_session,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return _PooledSession(session, adapter.counter)
+
+    def _retire(self, item: _PooledSession) -> bool:
+        """标记为淘汰, 返回是否可以立即关闭; 调用方需持有锁"""
+        item.retired = True
+        self._evicted += 1
+        if item.leases > 0:
+            return False
+        self._count_closed(item)
+        return True
+
+    def _count_closed(self, item: _PooledSession) -> None:
+        self._closed_requests += item.counter.requests
+        self._closed_opened += item.counter.opened
+        self._closed_reused += item.counter.reused
+
+    def _evict_idle(self, now: float) -> List[_PooledSession]:
+        expired = [
+            key
+            for key, item in self._sessions.items()
+            if item.leases == 0 and now - item.last_used > self.idle_timeout
+        ]
+        return [self._sessions.pop(key) for key in expired]
+
+    def _checkout(self, key: str, lease: bool) -> _PooledSession:
+        now = time.monotonic()
+        with self._lock:
+            retired = self._evict_idle(now)
+
+            item = self._sessions.pop(key, None)
+            if item is not None:
+                self._reused += 1
+            else:
+                item = self._new_session()
+                self._created += 1
+                while len(self._sessions) >= self.max_size:
+                    retired.append(self._sessions.popitem(last=False)[1])
+
+            item.last_used = now
+            item.leases += lease
+            self._sessions[key] = item
+            to_close = [r.session for r in retired if self._retire(r)]
+
+        for s in to_close:
+            s.close()
+        return item
+
+    def acquire(self, key: str) -> requests.Session:
+        """取得账号的会话但不持有租约, 仅用于读写cookie等不发请求的操作"""
+        return self._checkout(key, lease=False).session
+
+    @contextlib.contextmanager
+    def lease(self, key: str) -> Iterator[requests.Session]:
+        """在with块内使用账号的会话, 期间被淘汰也不会被关闭"""
+        item = self._checkout(key, lease=True)
+        try:
+            yield item.session
+        finally:
+            self._return(item)
+
+    def _return(self, item: _PooledSession) -> None:
+        with self._lock:
+            item.leases -= 1
+            item.last_used = time.monotonic()
+            close = item.retired and item.leases == 0
+            if close:
+                self._count_closed(item)
+        if close:
+            item.session.close()
+
+    def close(self) -> None:
+        with self._lock:
+            items = list(self._sessions.values())
+            self._sessions.clear()
+            to_close = [item.session for item in items if self._retire(item)]
+        for s in to_close:
+            s.close()
+
+    @property
+    def stats(self) -> PoolStats:
+        with self._lock:
+            items = list(self._sessions.values())
+            created, reused, evicted = self._created, self._reused, self._evicted
+            sent, opened = self._closed_requests, self._closed_opened
+            connections_reused = self._closed_reused
+        # 每个会话的连接复用分别计算, 不受其他会话(或池外请求)影响
+        for item in items:
+            sent += item.counter.requests
+            opened += item.counter.opened
+            connections_reused += item.counter.reused
+        return PoolStats(
+            sessions_created=created,
+            sessions_reused=reused,
+            sessions_evicted=evicted,
+            requests_sent=sent,
+            connections_opened=opened,
+            connections_reused=connections_reused,
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __repr__(self) -> str:
+        return (
+            f"SessionPool(size={len(self)}/{self.max_size}, "
+            f"idle_timeout={self.idle_timeout})"
+        )
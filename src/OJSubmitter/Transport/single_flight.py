@@ -0,0 +1,62 @@
+import threading
+from typing import Callable, Dict, Generic, Hashable, Optional, TypedDict, TypeVar
+
+_T = TypeVar("_T")
+
+
+class FlightStats(TypedDict):
+    executed: int  # 实际发出的请求数
+    shared: int  # 复用进行中请求而节省的请求数
+
+
+class _Call(Generic[_T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[_T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[_T]):
+    """合并并发的相同调用: 同一key同时只执行一次, 其余调用方等待并共享结果"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call[_T]] = {}
+        self._executed = 0
+        self._shared = 0
+
+    def do(
+        self, key: Hashable, fn: Callable[[], _T], timeout: Optional[float] = None
+    ) -> _T:
+        """`timeout`仅约束等待他人结果的时间, 超时抛出TimeoutError"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+            else:
+                self._shared += 1
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight call {key!r}")
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    @property
+    def stats(self) -> FlightStats:
+        with self._lock:
+            return FlightStats(executed=self._executed, shared=self._shared)
@@ -0,0 +1,139 @@
+import codecs
+from typing import Iterator, List, Optional, Sequence, TypedDict
+
+import requests
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+
+from ..Constant.transport import STREAM_CHUNK_SIZE, STREAM_DRAIN_MAX
+
+
+class StreamScan(TypedDict):
+    marker: Optional[str]  # 最先出现的标记, 读完仍未出现时为None
+    text: str  # 已读部分的文字(keep_text为False时为空)
+    bytes_read: int
+    stopped_early: bool  # 是否在读完响应体之前停止
+
+
+class MarkerScanner:
+    """在分块到达的响应体中查找标记
+
+    每块解码后与上一窗口末尾`最长标记长度-1`个字符拼接再查找, 跨块的标记
+    不会漏掉; 多字节字符由增量解码器处理.
+    """
+
+    def __init__(
+        self, markers: Sequence[str], encoding: str = "utf-8", keep_text: bool = False
+    ) -> None:
+        if not markers or not all(markers):
+            raise ValueError("markers must be non-empty strings")
+        self.markers = tuple(markers)
+        self.keep_text = keep_text
+        self.bytes_read = 0
+        self._keep = max(len(m) for m in self.markers) - 1
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._tail = ""
+        self._parts: List[str] = []
+
+    def feed(self, chunk: bytes, final: bool = False) -> Optional[str]:
+        """返回本块中(含跨块)最先出现的标记, 未出现时为None"""
+        self.bytes_read += len(chunk)
+        text = self._decoder.decode(chunk, final)
+        if self.keep_text:
+            self._parts.append(text)
+        window = self._tail + text
+        self._tail = window[max(0, len(window) - self._keep) :] if self._keep else ""
+
+        found: Optional[str] = None
+        position = len(window)
+        for marker in self.markers:
+            index = window.find(marker)
+            if index != -1 and index < position:
+                found, position = marker, index
+        return found
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+
+def iter_chunks(
+    resp: requests.Response, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """读到多少产出多少(每块最多`chunk_size`), 不等凑满一块; 异常与iter_content一致"""
+    read1 = getattr(resp.raw, "read1", None)
+    if read1 is None:
+        yield from resp.iter_content(chunk_size)
+        return
+    try:
+        while True:
+            chunk = read1(chunk_size, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+    except ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e) from e
+    except DecodeError as e:
+        raise requests.exceptions.ContentDecodingError(e) from e
+    except ReadTimeoutError as e:
+        raise requests.exceptions.ConnectionError(e) from e
+
+
+def iter_text(
+    resp: requests.Response, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[str]:
+    """`iter_chunks`的增量解码版本"""
+    decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    for chunk in iter_chunks(resp, chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _drain(resp: requests.Response) -> None:
+    """剩余部分不多时读完而不解码, 使连接可以复用; 否则直接关闭连接"""
+    length = resp.headers.get("Content-Length", "")
+    if not length.isdigit():
+        return
+    try:
+        consumed = resp.raw.tell()
+    except (AttributeError, OSError):
+        return
+    if int(length) - consumed <= STREAM_DRAIN_MAX:
+        for _ in iter_chunks(resp):
+            pass
+
+
+def scan_response(
+    resp: requests.Response,
+    markers: Sequence[str],
+    keep_text: bool = False,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> StreamScan:
+    """分块读取以`stream=True`发出的响应, 遇到任一标记即停止并关闭响应
+
+    调用方把"一定出现在目标之后"的标记也放进`markers`, 读到它即可断定目标不存在.
+    """
+    scanner = MarkerScanner(markers, resp.encoding or "utf-8", keep_text)
+    try:
+        for chunk in iter_chunks(resp, chunk_size):
+            marker = scanner.feed(chunk)
+            if marker is not None:
+                _drain(resp)
+                return StreamScan(
+                    marker=marker,
+                    text=scanner.text,
+                    bytes_read=scanner.bytes_read,
+                    stopped_early=True,
+                )
+        marker = scanner.feed(b"", final=True)
+        return StreamScan(
+            marker=marker,
+            text=scanner.text,
+            bytes_read=scanner.bytes_read,
+            stopped_early=False,
+        )
+    finally:
+        resp.close()
@@ -0,0 +1,424 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import as_completed
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import requests
+
+from ..Constant.endpoints import Route
+from ..Constant.transport import (
+    CFG_SESSION_IDLE_TIMEOUT,
+    CFG_SESSION_POOL_SIZE,
+    DEFAULT_SESSION_IDLE_TIMEOUT,
+    DEFAULT_SESSION_POOL_SIZE,
+    TrafficKind,
+)
+from ..Resource import Resource
+from .clock import ClockSync, server_clock
+from .deadline import Deadline, TimeoutTable
+from .endpoints import EndpointRegistry
+from .errors import CircuitOpenError, DeadlineExceeded, SubmitNotRetriedError
+from .rate_limiter import RateLimiter
+from .resilience import Resilience
+from .session_pool import PoolStats, SessionPool
+from .single_flight import SingleFlight
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), str(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(str(v) for v in value)
+    return None if value is None else str(value)
+
+
+def _close_response(future: "Future[requests.Response]") -> None:
+    """对冲中落败的请求完成后关闭响应, 归还其连接"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="oj-hedge")
+
+
+class Transport:
+    """Crawler 的统一出口, 所有对OJ的请求都经由账号对应的池化会话发出"""
+
+    def __init__(
+        self,
+        pool: SessionPool,
+        endpoints: EndpointRegistry,
+        limiter: RateLimiter,
+        resilience: Resilience,
+        single_flight: Optional[SingleFlight[requests.Response]] = None,
+        timeouts: Optional[TimeoutTable] = None,
+        clock: Optional[ClockSync] = None,
+    ) -> None:
+        self.pool = pool
+        self.endpoints = endpoints
+        self.limiter = limiter
+        self.resilience = resilience
+        self.single_flight: SingleFlight[requests.Response] = (
+            single_flight or SingleFlight()
+        )
+        self.timeouts = timeouts or TimeoutTable()
+        self.clock = clock or ClockSync()
+
+    @staticmethod
+    def from_resource(resource: Resource) -> "Transport":
+        return Transport(
+            SessionPool(
+                max_size=int(
+                    resource.local_config_get(
+                        CFG_SESSION_POOL_SIZE, DEFAULT_SESSION_POOL_SIZE
+                    )
+                ),
+                idle_timeout=float(
+                    resource.local_config_get(
+                        CFG_SESSION_IDLE_TIMEOUT, DEFAULT_SESSION_IDLE_TIMEOUT
+                    )
+                ),
+            ),
+            EndpointRegistry.from_resource(resource),
+            RateLimiter.from_resource(resource),
+            Resilience.from_resource(resource),
+            timeouts=TimeoutTable.from_resource(resource),
+            clock=server_clock,
+        )
+
+    def session(self, key: str) -> requests.Session:
+        return self.pool.acquire(key)
+
+    def _send_via(
+        self,
+        hosts: List[str],
+        method: str,
+        path: str,
+        *,
+        key: str,
+        route: Route,
+        kind: TrafficKind,
+        cookies: Optional[Dict[str, str]],
+        deadline: Optional[Deadline],
+        **kwargs: Any,
+    ) -> requests.Response:
+        breaker = self.resilience.breaker
+        default_timeout = float(kwargs.pop("timeout", None) or self.timeouts.get(path))
+        failed: Optional[requests.Response] = None
+        last_exc: Optional[Exception] = None
+        for host in hosts:
+            if not breaker.allow(host):
+                last_exc = CircuitOpenError(host)
+                continue
+
+            # 半开状态下放行的试探请求无论以何种方式结束都要归还名额
+            try:
+                wait = self.limiter.reserve(
+                    host,
+                    key,
+                    kind,
+                    None if deadline is None else deadline.remaining(),
+                )
+                if wait is None:
+                    raise DeadlineExceeded(
+                        f"Deadline exceeded waiting for {path} quota"
+                    )
+                if wait > 0:
+                    time.sleep(wait)
+
+                timeout = (
+                    default_timeout
+                    if deadline is None
+                    else deadline.timeout(default_timeout, path)
+                )
+                start = time.monotonic()
+                sent = time.time()
+                try:
+                    with self.pool.lease(key) as session:
+                        resp = session.request(
+                            method,
+                            host + path,
+                            cookies=cookies,
+                            timeout=timeout,
+                            **kwargs,
+                        )
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if timeout < default_timeout and isinstance(e, requests.Timeout):
+                        # 超时由截止时间截断所致, 不归咎于节点
+                        raise DeadlineExceeded(
+                            f"Deadline exceeded during {path}"
+                        ) from e
+                    breaker.record_failure(host)
+                    self.endpoints.record_failure(host)
+                    if route is Route.SESSION:
+                        self.endpoints.unpin(key)
+                    last_exc = e
+                    continue
+
+                latency = time.monotonic() - start
+                self.clock.observe(resp.headers.get("Date"), sent, sent + latency)
+                resp.encoding = "utf-8"
+                if resp.status_code >= 500:
+                    breaker.record_failure(host)
+                    self.endpoints.record_failure(host)
+                    if failed is not None:
+                        failed.close()
+                    failed = resp
+                    continue
+
+                breaker.record_success(host)
+                self.endpoints.record_success(host, latency)
+                self.resilience.latency.record(path, latency)
+                if route is Route.LOGIN:
+                    self.endpoints.pin(key, host)
+                return resp
+            finally:
+                breaker.release(host)
+
+        if failed is not None:
+            return failed
+        assert last_exc is not None
+        raise last_exc
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        key: str,
+        route: Route,
+        kind: TrafficKind,
+        cookies: Optional[Dict[str, str]],
+        deadline: Optional[Deadline],
+        **kwargs: Any,
+    ) -> requests.Response:
+        if route is Route.SESSION:
+            hosts = [self.endpoints.session_host(key)]
+        else:
+            hosts = self.endpoints.read_candidates()
+
+        def send(candidates: List[str]) -> requests.Response:
+            return self._send_via(
+                candidates,
+                method,
+                path,
+                key=key,
+                route=route,
+                kind=kind,
+                cookies=cookies,
+                deadline=deadline,
+                **kwargs,
+            )
+
+        delay = (
+            self.resilience.hedge_delay(path)
+            if method == "GET" and route is Route.READ and not kwargs.get("stream")
+            else None
+        )
+        if delay is None:
+            return send(hosts)
+
+        # 对冲: 主请求超过延迟分位数仍未返回时, 向下一节点(或同一节点)再发一次
+        primary = _hedge_executor.submit(send, hosts)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+
+        self.resilience.count("hedged")
+        backup = _hedge_executor.submit(send, hosts[1:] + hosts[:1])
+        errors: List[BaseException] = []
+        for fut in as_completed([primary, backup]):
+            exc = fut.exception()
+            if exc is None:
+                loser = backup if fut is primary else primary
+                if not loser.cancel():
+                    loser.add_done_callback(_close_response)
+                return fut.result()
+            errors.append(exc)
+        raise errors[-1]
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        key: str,
+        route: Route,
+        kind: TrafficKind = TrafficKind.READ,
+        cookies: Optional[Dict[str, str]] = None,
+        idempotent: Optional[bool] = None,
+        idempotency_check: Optional[Callable[[], bool]] = None,
+        deadline: Optional[Deadline] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """发送请求
+
+        读请求与登录按延迟选择节点, 连接失败或5xx时切换到下一节点;
+        会话请求只发往会话所属节点, 该节点不可达时解除固定以便重新登录.
+        幂等请求失败后按指数退避重试; 非幂等请求只有`idempotency_check`
+        返回True(确认上次请求未生效)时才会重试.
+        同一会话并发的相同GET只发出一次, 其余调用方共享该响应;
+        `stream=True`的请求各自独占响应体, 不参与合并与对冲.
+        每次发送都带有超时: 取端点默认超时与`deadline`(未传入时为当前上下文的
+        Deadline)剩余时间中的较小者, 截止时间已过则抛出DeadlineExceeded.
+        """
+        deadline = Deadline.resolve(deadline)
+        if deadline is not None:
+            deadline.check(path)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+
+        def run() -> requests.Response:
+            return self._request(
+                method,
+                path,
+                key=key,
+                route=route,
+                kind=kind,
+                cookies=cookies,
+                idempotent=bool(idempotent),
+                idempotency_check=idempotency_check,
+                deadline=deadline,
+                **kwargs,
+            )
+
+        if method != "GET" or kwargs.get("stream"):
+            return run()
+
+        flight_key = (
+            path,
+            _freeze(kwargs.get("params")),
+            key,
+            _freeze(cookies),
+            route,
+        )
+        try:
+            return self.single_flight.do(
+                flight_key,
+                run,
+                timeout=None if deadline is None else deadline.remaining(),
+            )
+        except TimeoutError as e:
+            raise DeadlineExceeded(f"Deadline exceeded waiting for {path}") from e
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        key: str,
+        route: Route,
+        kind: TrafficKind,
+        cookies: Optional[Dict[str, str]],
+        idempotent: bool,
+        idempotency_check: Optional[Callable[[], bool]],
+        deadline: Optional[Deadline],
+        **kwargs: Any,
+    ) -> requests.Response:
+        retry = self.resilience.retry
+        resp: Optional[requests.Response] = None
+        last_exc: Optional[Exception] = None
+        for attempt in range(retry.max_attempts):
+            if attempt:
+                if not idempotent and (
+                    idempotency_check is None or not idempotency_check()
+                ):
+                    break
+                pause = retry.backoff(attempt)
+                if deadline is not None and pause >= deadline.remaining():
+                    break
+                self.resilience.count("retried")
+                time.sleep(pause)
+                if resp is not None:
+                    resp.close()
+
+            try:
+                resp = self._send(
+                    method,
+                    path,
+                    key=key,
+                    route=route,
+                    kind=kind,
+                    cookies=cookies,
+                    deadline=deadline,
+                    **kwargs,
+                )
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
+            except (requests.ConnectionError, requests.Timeout) as e:
+                resp, last_exc = None, e
+                continue
+
+            if resp.status_code < 500:
+                return resp
+
+        if resp is not None:
+            return resp
+        assert last_exc is not None
+        if not idempotent:
+            raise SubmitNotRetriedError(str(last_exc)) from last_exc
+        raise last_exc
+
+    def get(
+        self,
+        path: str,
+        *,
+        key: str,
+        route: Route = Route.READ,
+        kind: TrafficKind = TrafficKind.READ,
+        cookies: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        return self.request(
+            "GET", path, key=key, route=route, kind=kind, cookies=cookies, **kwargs
+        )
+
+    def post(
+        self,
+        path: str,
+        *,
+        key: str,
+        route: Route = Route.SESSION,
+        kind: TrafficKind = TrafficKind.READ,
+        cookies: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        return self.request(
+            "POST", path, key=key, route=route, kind=kind, cookies=cookies, **kwargs
+        )
+
+    @property
+    def stats(self) -> PoolStats:
+        return self.pool.stats
+
+    def describe(self) -> str:
+        pool = self.stats
+        flight = self.single_flight.stats
+        counters = self.resilience.counters
+        lines = [
+            f"连接池: 新建会话{pool['sessions_created']}个, "
+            f"复用{pool['sessions_reused']}次, 淘汰{pool['sessions_evicted']}个; "
+            f"发出请求{pool['requests_sent']}次, 新建连接{pool['connections_opened']}个, "
+            f"复用连接{pool['connections_reused']}次",
+            f"请求合并: 实际执行{flight['executed']}次, 共享结果{flight['shared']}次",
+            f"重试{counters.get('retried', 0)}次, 对冲读取{counters.get('hedged', 0)}次",
+        ]
+        for kind, st in self.limiter.stats.items():
+            lines.append(
+                f"限流[{kind}]: 请求{st['acquired']}次, 等待{st['delayed']}次, "
+                f"累计{st['total_wait']:.2f}秒, 最长{st['max_wait']:.2f}秒"
+            )
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return (
+            f"Transport(pool={self.pool}, endpoints={self.endpoints}, "
+            f"limiter={self.limiter})"
+        )
+
+
+transport = Transport.from_resource(Resource())
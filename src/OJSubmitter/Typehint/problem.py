@@ -1,4 +1,6 @@
-from typing import Literal, TypedDict, Union
+from typing import List, Literal, Optional, TypedDict, Union
+
+from ..Constant.status import RunningStatus, Verdict
 
 
 class BankProblemInfo(TypedDict):
@@ -17,6 +19,66 @@ class LevelProblemInfo(TypedDict):
     pid: int  # 题号
 
 
+class StageRow(TypedDict):
+    pid: int  # 题号
+    topic: str
+    finished: bool
+
+
+class StageSnapshot(TypedDict):
+    cid: int  # 关卡号
+    existing: bool
+    accessible: bool
+    status: RunningStatus
+    status_code: int
+    rows: List[StageRow]
+    start_at: Optional[float]  # 时间戳, 页面未给出时为None
+    end_at: Optional[float]
+    fetched_at: float  # time.time()
+
+
+class StageDiff(TypedDict):
+    cid: int  # 关卡号
+    previous_status: Optional[RunningStatus]  # None表示首次获取
+    status: RunningStatus
+    existing: bool
+    existing_changed: bool
+    added: List[StageRow]
+    removed: List[StageRow]
+    finished_changed: List[StageRow]  # 变化后的行
+
+
+class WaitReport(TypedDict):
+    cid: int  # 关卡号
+    status: RunningStatus  # 结束等待时的状态
+    existing: bool  # 为False时因关卡不存在而结束等待
+    start_at: Optional[float]  # 页面给出的开始时间
+    detected_at: Optional[float]  # 观察到开始的时间
+    reaction_latency: Optional[float]  # sec, detected_at - start_at
+    requests: int  # 总请求数
+    burst_requests: int  # 其中密集轮询的请求数
+    waited: float  # sec
+    errors: int  # 等待期间失败的轮询次数
+    error: str  # 因连续失败而放弃时的最后一个错误, 否则为空
+    snapshot: Optional[StageSnapshot]  # 结束等待时的关卡快照
+
+
+class VerdictRow(TypedDict):
+    running_id: int  # 运行号
+    verdict: Optional[Verdict]  # 无法识别时为None
+    result: str  # 结果单元格文字
+    final: bool  # 评测结果不会再变化
+    cells: List[str]  # 该行各单元格文字
+
+
+class PageTiming(TypedDict):
+    pid: int  # 题号
+    topic: str
+    elapsed: float  # sec, 请求+解析
+    ok: bool
+    error: str
+
+
 class OneProblemContent(TypedDict):
     description: str
     input: str